@@ -0,0 +1,97 @@
+# assets.py — ASCII art lookup, pre-rendering and caching
+import sys
+from collections import OrderedDict
+
+from src.content import ASSET_SEARCH_PATHS, CONTENT, find_asset
+
+# Upper bound on the characters held by the rendered-art cache.
+MAX_ART_CACHE_CHARS = 256 * 1024
+
+# A line holding only this separates frames in a .frames file.
+FRAME_SEPARATOR = "~~~"
+
+
+def render_art(entry):
+    """Joins an art entry into the exact text show_ascii_art used to print line by line."""
+    text = "\n" + "\n".join(entry.get("art", [])) + "\n"
+    if "description" in entry:
+        text += f"\n{entry['description']}\n"
+    return text
+
+
+class AssetManager:
+    """Serves ASCII art as ready-to-write strings.
+
+    Pieces from the ascii_art.json catalog are joined once and kept in an
+    LRU cache capped at max_chars characters; the cache is dropped when the
+    catalog is hot-reloaded. Animations live in <id>.frames files on the
+    search paths and are read one frame at a time, never as a whole.
+    """
+
+    def __init__(self, search_paths=ASSET_SEARCH_PATHS, max_chars=MAX_ART_CACHE_CHARS):
+        self.search_paths = search_paths
+        self.max_chars = max_chars
+        self.rendered = OrderedDict()  # art id -> text, least recently used first
+        self.cached_chars = 0
+        self.catalog_version = None
+
+    def catalog(self):
+        return CONTENT.get("ascii_art")
+
+    def _check_version(self):
+        version = CONTENT.version("ascii_art")
+        if version != self.catalog_version:
+            self.rendered.clear()
+            self.cached_chars = 0
+            self.catalog_version = version
+
+    def get(self, art_id):
+        """The rendered text for a catalog piece, or None if there is no such piece."""
+        self._check_version()
+        text = self.rendered.get(art_id)
+        if text is not None:
+            self.rendered.move_to_end(art_id)
+            return text
+        entry = self.catalog().get(art_id)
+        if entry is None:
+            return None
+        text = render_art(entry)
+        if len(text) <= self.max_chars:
+            self.rendered[art_id] = text
+            self.cached_chars += len(text)
+            while self.cached_chars > self.max_chars:
+                _, dropped = self.rendered.popitem(last=False)
+                self.cached_chars -= len(dropped)
+        return text
+
+    def frames(self, art_id):
+        """Yields each frame of <art_id>.frames as one string, reading lazily."""
+        path = find_asset(f"{art_id}.frames", self.search_paths)
+        if path is None:
+            return
+        with open(path, "r") as f:
+            frame = []
+            for line in f:
+                if line.rstrip("\n") == FRAME_SEPARATOR:
+                    yield "".join(frame)
+                    frame = []
+                else:
+                    frame.append(line)
+            if frame:
+                yield "".join(frame)
+
+    def show(self, art_id, out=None):
+        """Writes a piece with a single write, or an animation one frame per write."""
+        out = out or sys.stdout
+        text = self.get(art_id)
+        if text is not None:
+            out.write(text)
+            return True
+        shown = False
+        for frame in self.frames(art_id):
+            out.write(frame)
+            shown = True
+        return shown
+
+
+ASSETS = AssetManager()
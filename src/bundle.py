@@ -0,0 +1,163 @@
+# bundle.py — Precompiled content bundle: validated content plus prebuilt indexes
+import mmap
+import os
+import pickle
+import sys
+import time
+
+BUNDLE_FILE = os.path.join("data", "content.bundle")
+BUNDLE_MAGIC = b"FSBUNDLE1\n"
+
+# The bundle is a pickle, and unpickling runs code, so it is only read when
+# asked for with FORGOTTEN_SHIP_BUNDLE=1, never just because the file exists.
+USE_BUNDLE = os.environ.get("FORGOTTEN_SHIP_BUNDLE") == "1"
+
+# SHIP_MAP lives in Python source, so the room index is stale once ship.py changes.
+SHIP_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ship.py")
+
+
+def source_stamps(files):
+    """(size, mtime) of every source the bundle was built from, None if missing."""
+    stamps = {}
+    for name, path in {**files, "ship": SHIP_SOURCE}.items():
+        try:
+            info = os.stat(path)
+            stamps[name] = (info.st_size, info.st_mtime_ns)
+        except OSError:
+            stamps[name] = None
+    return stamps
+
+
+def load_bundle(files, path=BUNDLE_FILE):
+    """Maps the bundle into memory and unpickles it in one pass.
+
+    Returns None if there is no bundle, it is unreadable, it could have
+    been written by another user, or any source file has changed since it
+    was built; callers then read the JSON files.
+    """
+    if not os.path.exists(path):
+        return None
+    info = os.stat(path)
+    if hasattr(os, "getuid") and (info.st_uid != os.getuid() or info.st_mode & 0o022):
+        print(f"{path} is owned or writable by another user; reading the JSON files instead.")
+        return None
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(BUNDLE_MAGIC)] != BUNDLE_MAGIC:
+                print(f"{path} is not a content bundle; reading the JSON files instead.")
+                return None
+            bundle = pickle.loads(data[len(BUNDLE_MAGIC):])
+    except (OSError, ValueError, pickle.UnpicklingError, EOFError) as e:
+        print(f"Error loading {path}: {e}")
+        return None
+    if bundle.get("sources") != source_stamps(files):
+        print(f"{path} is out of date; reading the JSON files instead. Rebuild it with 'python -m src.bundle'.")
+        return None
+    return bundle
+
+
+def validate_content(content):
+    """Returns a list of problems found in the parsed content files."""
+    problems = []
+    for name, data in content.items():
+        if not isinstance(data, dict):
+            problems.append(f"{name}: expected a JSON object at the top level")
+
+    for category, puzzles in content.get("puzzles", {}).items():
+        for index, puzzle in enumerate(puzzles):
+            where = f"puzzles.{category}[{index}]"
+            if "question" not in puzzle:
+                problems.append(f"{where}: missing question")
+            kind = puzzle.get("type")
+            if kind == "riddle":
+                if not puzzle.get("answers"):
+                    problems.append(f"{where}: riddle has no answers")
+            elif kind in ("logic", "cipher"):
+                if "answer" not in puzzle:
+                    problems.append(f"{where}: missing answer")
+            else:
+                problems.append(f"{where}: unknown puzzle type {kind!r}")
+
+    seen_ids = {}
+    for character, rooms in content.get("dialogue", {}).items():
+        for room, lines in rooms.items():
+            for index, line in enumerate(lines):
+                where = f"dialogue.{character}.{room}[{index}]"
+                if "line" not in line:
+                    problems.append(f"{where}: missing line text")
+                line_id = line.get("id")
+                if line_id is not None:
+                    if line_id in seen_ids:
+                        problems.append(f"{where}: id {line_id!r} already used at {seen_ids[line_id]}")
+                    seen_ids[line_id] = where
+
+    logs = content.get("logs", {})
+    for log_id, log in logs.get("ship_logs", {}).items():
+        if "title" not in log or "content" not in log:
+            problems.append(f"logs.ship_logs.{log_id}: needs a title and content")
+
+    for art_id, art in content.get("ascii_art", {}).items():
+        if not isinstance(art.get("art") if isinstance(art, dict) else None, list):
+            problems.append(f"ascii_art.{art_id}: needs an 'art' list of lines")
+    return problems
+
+
+def build_indexes(content):
+    """Lookups the game would otherwise build on every start."""
+    from src.ship import RoomIndex, SHIP_MAP
+
+    dialogue_by_id = {}
+    for character, rooms in content.get("dialogue", {}).items():
+        for room, lines in rooms.items():
+            for index, line in enumerate(lines):
+                if line.get("id") is not None:
+                    dialogue_by_id[line["id"]] = (character, room, index)
+
+    puzzle_list = [
+        (category, index)
+        for category, puzzles in content.get("puzzles", {}).items()
+        for index in range(len(puzzles))
+    ]
+
+    return {
+        "rooms": RoomIndex(SHIP_MAP).snapshot(),
+        "dialogue_by_id": dialogue_by_id,
+        "puzzle_list": puzzle_list,
+    }
+
+
+def build_bundle(path=BUNDLE_FILE):
+    """Validates every content file and writes the bundle. Returns the problems found."""
+    from src.content import ContentRegistry
+
+    # A registry of its own so the bundle is always built from the JSON sources.
+    registry = ContentRegistry(bundle_path=None)
+    content = {name: registry.get(name) for name in registry.files}
+    problems = validate_content(content)
+    if problems:
+        return problems
+
+    bundle = {
+        "sources": source_stamps(registry.files),
+        "content": content,
+        "indexes": build_indexes(content),
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(BUNDLE_MAGIC)
+        pickle.dump(bundle, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return []
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else BUNDLE_FILE
+    started = time.perf_counter()
+    problems = build_bundle(target)
+    if problems:
+        print("Content has problems; no bundle written:")
+        for problem in problems:
+            print(f" - {problem}")
+        sys.exit(1)
+    print(f"Wrote {target} ({os.path.getsize(target)} bytes) in {(time.perf_counter() - started) * 1000:.1f} ms.")
+    print("Run the game with FORGOTTEN_SHIP_BUNDLE=1 to load it.")
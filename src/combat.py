@@ -1,15 +1,15 @@
 # combat.py — Manages combat between player and enemy
-import random
 from .player import Player
 from .enemy import Scuttler, Lurker, Stalker
+from .replay import RNG
 
-def combat(player, enemy):
+def combat(player, enemy, rng=RNG):
     """Handles combat sequence between player and enemy."""
     print(f"\n⚔️  A wild {enemy.name} appears!")
 
     while player.health > 0 and enemy.is_alive():
         # Player's turn to attack (randomized damage between 5 and 15)
-        player_attack = random.randint(5, 15)
+        player_attack = rng.randint(5, 15)
         enemy.take_damage(player_attack)
         print(f"You hit the {enemy.name} for {player_attack} damage.")
 
@@ -19,7 +19,7 @@ def combat(player, enemy):
             return True
 
         # Enemy's counterattack
-        enemy_attack = enemy.attack()
+        enemy_attack = enemy.attack(rng)
         player.health -= enemy_attack
         print(f"The {enemy.name} hits you for {enemy_attack} damage.")
         print(f"Your health is now {player.health}.")
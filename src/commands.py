@@ -0,0 +1,173 @@
+# commands.py — Command registry: prefix-trie verb lookup, aliases and argument grammars
+from src.coords import DIRECTIONS
+
+
+# A handler returns STOP to end the game loop.
+STOP = "stop"
+
+
+class CommandError(ValueError):
+    """A command line that names no command or does not fit its grammar."""
+
+
+class PrefixTrie:
+    """Maps words and any unambiguous prefix of them to a value.
+
+    Every node remembers which words lie below it, so resolving a prefix
+    walks one node per character and never scans the word list.
+    """
+
+    def __init__(self):
+        self.root = {"children": {}, "value": None, "words": set()}
+        self.values = {}
+
+    def insert(self, word, value):
+        node = self.root
+        node["words"].add(word)
+        for char in word:
+            node = node["children"].setdefault(char, {"children": {}, "value": None, "words": set()})
+            node["words"].add(word)
+        node["value"] = word
+        self.values[word] = value
+
+    def resolve(self, prefix):
+        """Returns the value for prefix, or None if nothing starts with it.
+
+        Raises CommandError if the prefix fits several values.
+        """
+        node = self.root
+        for char in prefix:
+            node = node["children"].get(char)
+            if node is None:
+                return None
+        if node["value"] is not None:
+            return self.values[node["value"]]
+        matches = {self.values[word] for word in node["words"]}
+        if len(matches) == 1:
+            return matches.pop()
+        names = sorted(node["words"])
+        raise CommandError(f"'{prefix}' could mean {', '.join(names)}")
+
+
+_DIRECTIONS = PrefixTrie()
+for _direction in DIRECTIONS:
+    _DIRECTIONS.insert(_direction, _direction)
+
+
+def _parse_direction(text):
+    direction = _DIRECTIONS.resolve(text)
+    if direction is None:
+        raise CommandError(f"Invalid direction. Use: {', '.join(DIRECTIONS)}.")
+    return direction
+
+
+def _parse_int(text):
+    try:
+        return int(text)
+    except ValueError:
+        raise CommandError(f"'{text}' is not a whole number")
+
+
+# Argument types a grammar may use; "text" takes the rest of the line.
+ARGUMENT_TYPES = {
+    "word": str,
+    "text": str,
+    "int": _parse_int,
+    "direction": _parse_direction,
+}
+
+
+def compile_grammar(grammar):
+    """'direction:direction [steps:int]' -> [(name, type, optional), ...]."""
+    params = []
+    for token in grammar.split():
+        optional = token.startswith("[") and token.endswith("]")
+        name, _, kind = token.strip("[]").partition(":")
+        kind = kind or "word"
+        if kind not in ARGUMENT_TYPES:
+            raise ValueError(f"Unknown argument type '{kind}' in grammar '{grammar}'")
+        if kind == "text" and params and params[-1][1] == "text":
+            raise ValueError(f"Only the last argument can take the rest of the line: '{grammar}'")
+        params.append((name, kind, optional))
+    return params
+
+
+class Command:
+    def __init__(self, name, handler, grammar="", usage=None, aliases=()):
+        self.name = name
+        self.handler = handler
+        self.params = compile_grammar(grammar)
+        self.usage = usage or " ".join([name, grammar]).strip()
+        self.aliases = tuple(aliases)
+
+    def parse(self, words):
+        """Turns the words after the verb into keyword arguments for the handler."""
+        kwargs = {}
+        rest = list(words)
+        for name, kind, optional in self.params:
+            if not rest:
+                if optional:
+                    continue
+                raise CommandError(f"Usage: {self.usage}")
+            if kind == "text":
+                kwargs[name], rest = " ".join(rest), []
+            else:
+                kwargs[name] = ARGUMENT_TYPES[kind](rest.pop(0))
+        if rest:
+            raise CommandError(f"Usage: {self.usage}")
+        return kwargs
+
+
+class CommandRegistry:
+    """Commands by verb. Single-word verbs and aliases resolve through a
+    prefix trie, so "mo b 3" means "move bow 3"; fixed two-word phrases
+    such as "use door" are matched whole before the verb is looked up.
+    Each command's argument grammar is compiled once, when registered.
+    """
+
+    def __init__(self):
+        self.commands = []
+        self.verbs = PrefixTrie()
+        self.phrases = {}
+
+    def add(self, command):
+        self.commands.append(command)
+        for name in (command.name, *command.aliases):
+            if " " in name:
+                self.phrases[name] = command
+            else:
+                self.verbs.insert(name, command)
+        return command
+
+    def command(self, name, grammar="", usage=None, aliases=()):
+        """Decorator registering handler(game, **arguments)."""
+        def register(handler):
+            self.add(Command(name, handler, grammar, usage, aliases))
+            return handler
+        return register
+
+    def parse(self, line):
+        """Returns (command, kwargs) for a command line."""
+        words = line.split()
+        if not words:
+            raise CommandError("Invalid command. Type 'help' for options.")
+        if len(words) >= 2:
+            command = self.phrases.get(f"{words[0]} {words[1]}")
+            if command is not None:
+                return command, command.parse(words[2:])
+        command = self.verbs.resolve(words[0])
+        if command is None:
+            raise CommandError("Invalid command. Type 'help' for options.")
+        return command, command.parse(words[1:])
+
+    def dispatch(self, game, line):
+        """Runs a command line. Returns the handler's result, or None after an error."""
+        try:
+            command, kwargs = self.parse(line)
+        except CommandError as e:
+            print(e)
+            return None
+        return command.handler(game, **kwargs)
+
+    def usages(self):
+        return [command.usage for command in self.commands]
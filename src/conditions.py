@@ -0,0 +1,180 @@
+# conditions.py — Small condition language for dialogue and puzzle triggers
+import re
+
+_TOKEN = re.compile(r"""\s*(?:(\()|(\))|"([^"]*)"|'([^']*)'|([^\s()"']+))""")
+
+# Predicate word -> ConditionState attribute it tests.
+PREDICATES = {
+    "has": "items",
+    "visited": "rooms",
+    "flag": "flags",
+    "solved": "solved",
+}
+
+# Names compared in lower case.
+CASE_INSENSITIVE = {"items", "rooms"}
+
+_compiled = {}
+
+
+class ConditionError(ValueError):
+    pass
+
+
+class ConditionState:
+    """The sets a condition is checked against.
+
+    Anything supporting `in` works, but sets keep every check O(1).
+    """
+
+    __slots__ = ("tasks", "items", "rooms", "flags", "solved")
+
+    def __init__(self, tasks=(), items=(), rooms=(), flags=(), solved=()):
+        self.tasks = tasks
+        self.items = items
+        self.rooms = rooms
+        self.flags = flags
+        self.solved = solved
+
+
+def tokenize(text):
+    """Returns (kind, value) pairs; kind is "(", ")", "name" or "quoted"."""
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match or match.end() == pos:
+            raise ConditionError(f"Cannot read condition {text!r} at position {pos}")
+        pos = match.end()
+        open_paren, close_paren, double, single, word = match.groups()
+        if open_paren:
+            tokens.append(("(", "("))
+        elif close_paren:
+            tokens.append((")", ")"))
+        elif word is not None:
+            tokens.append(("name", word))
+        else:
+            tokens.append(("quoted", double if double is not None else single))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def is_word(self, word):
+        kind, value = self.peek()
+        return kind == "name" and value.lower() == word
+
+    def parse(self):
+        if not self.tokens:
+            raise ConditionError("Empty condition")
+        check = self.parse_or()
+        if self.pos != len(self.tokens):
+            raise ConditionError(f"Unexpected {self.peek()[1]!r} in condition {self.text!r}")
+        return check
+
+    def parse_or(self):
+        terms = [self.parse_and()]
+        while self.is_word("or"):
+            self.pos += 1
+            terms.append(self.parse_and())
+        if len(terms) == 1:
+            return terms[0]
+        terms = tuple(terms)
+
+        def any_of(state):
+            for term in terms:
+                if term(state):
+                    return True
+            return False
+        return any_of
+
+    def parse_and(self):
+        terms = [self.parse_not()]
+        while self.is_word("and"):
+            self.pos += 1
+            terms.append(self.parse_not())
+        if len(terms) == 1:
+            return terms[0]
+        terms = tuple(terms)
+
+        def all_of(state):
+            for term in terms:
+                if not term(state):
+                    return False
+            return True
+        return all_of
+
+    def parse_not(self):
+        if self.is_word("not"):
+            self.pos += 1
+            inner = self.parse_not()
+            return lambda state: not inner(state)
+        return self.parse_atom()
+
+    def parse_atom(self):
+        kind, value = self.peek()
+        if kind == "(":
+            self.pos += 1
+            inner = self.parse_or()
+            if self.peek()[0] != ")":
+                raise ConditionError(f"Missing ')' in condition {self.text!r}")
+            self.pos += 1
+            return inner
+        if kind == "name" and value.lower() in PREDICATES:
+            self.pos += 1
+            return _member(PREDICATES[value.lower()], self.parse_name())
+        return _member("tasks", self.parse_name())
+
+    def parse_name(self):
+        """A quoted string, or words up to the next and/or/parenthesis."""
+        kind, value = self.peek()
+        if kind == "quoted":
+            self.pos += 1
+            return value
+        words = []
+        while kind == "name" and value.lower() not in ("and", "or"):
+            words.append(value)
+            self.pos += 1
+            kind, value = self.peek()
+        if not words:
+            raise ConditionError(f"Expected a name in condition {self.text!r}")
+        return " ".join(words)
+
+
+def _member(attribute, name):
+    if attribute in CASE_INSENSITIVE:
+        name = name.lower()
+    return lambda state: name in getattr(state, attribute)
+
+
+def compile_condition(text):
+    """Returns a function state -> bool. Each distinct text is parsed only once.
+
+        has Flashlight and visited Bridge and not rachel_moved
+        (solved logic_0 or flag met_rachel) and has "Room 1 Key"
+
+    A bare name is a completed task; has, visited, flag and solved test the
+    inventory, rooms entered, dialogue flags and solved puzzles. Names run
+    to the next and/or/parenthesis, so quotes are optional. Item and room
+    names ignore case.
+    """
+    check = _compiled.get(text)
+    if check is None:
+        check = _compiled[text] = _Parser(text).parse()
+    return check
+
+
+def simple_task(text):
+    """The task name if the condition is just one bare task name, else None."""
+    tokens = tokenize(text)
+    if len(tokens) == 1 and tokens[0][0] == "name" and tokens[0][1].lower() not in PREDICATES:
+        return tokens[0][1]
+    return None
@@ -0,0 +1,188 @@
+# content.py — Shared, lazily loaded game content (dialogue, logs, puzzles, art)
+import json
+import os
+import time
+
+from src.bundle import BUNDLE_FILE, USE_BUNDLE, load_bundle
+
+# Directories searched, in order, for art files.
+ASSET_SEARCH_PATHS = [
+    os.path.join("data", "art"),
+    "data",
+    "assets",
+]
+
+
+def find_asset(filename, search_paths=ASSET_SEARCH_PATHS):
+    """Path of the first search directory holding filename, or None."""
+    for directory in search_paths:
+        path = os.path.join(directory, filename)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+CONTENT_FILES = {
+    "dialogue": os.path.join("data", "dialogue.json"),
+    "logs": os.path.join("data", "logs.json"),
+    "puzzles": os.path.join("data", "puzzles.json"),
+    "ascii_art": find_asset("ascii_art.json") or os.path.join("data", "ascii_art.json"),
+}
+
+# Seconds between checks of the loaded files for edits; None turns hot reload off.
+RELOAD_POLL_SECONDS = 2.0
+
+# Bundle indexes derived from each content file, dropped once that file is reloaded.
+INDEX_SOURCES = {
+    "dialogue_by_id": "dialogue",
+    "puzzle_list": "puzzles",
+}
+
+
+def file_stamp(path):
+    """(size, mtime) of a file, or None if it is missing."""
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return (info.st_size, info.st_mtime_ns)
+
+
+class ContentRegistry:
+    """Parses each content file at most once, on first use, and shares the result.
+
+    Callers must treat what get() returns as read-only; per-session changes
+    belong in the content overlay. stats() reports what each file cost to
+    load, so startup time can be attributed to the data behind it.
+
+    With FORGOTTEN_SHIP_BUNDLE=1 and an up-to-date bundle built by
+    'python -m src.bundle', all content and its prebuilt indexes come from
+    that one file instead.
+
+    poll() checks the stamps of loaded files and re-parses only those that
+    changed. The new object replaces the old one in a single assignment,
+    and its version number goes up. Listeners are told which file changed,
+    so anything derived from it can be rebuilt on its own.
+    """
+
+    def __init__(self, files=CONTENT_FILES, bundle_path=BUNDLE_FILE if USE_BUNDLE else None,
+                 poll_interval=RELOAD_POLL_SECONDS):
+        self.files = dict(files)
+        self.bundle_path = bundle_path
+        self.bundle = None
+        self.data = {}
+        self.timings = {}   # name -> (bytes, seconds)
+        self.stamps = {}    # name -> file stamp when it was read
+        self.versions = {}  # name -> bumped on every reload
+        self.listeners = []  # called with (name, new data) after a reload
+        self.poll_interval = poll_interval
+        self.next_poll = 0.0
+
+    def _bundle(self):
+        """The loaded bundle, or {} when there is none to use. Tried once."""
+        if self.bundle is None:
+            self.bundle = {}
+            if self.bundle_path:
+                started = time.perf_counter()
+                bundle = load_bundle(self.files, self.bundle_path)
+                if bundle is not None:
+                    self.bundle = bundle
+                    self.timings["bundle"] = (os.path.getsize(self.bundle_path), time.perf_counter() - started)
+        return self.bundle
+
+    def get(self, name):
+        data = self.data.get(name)
+        if data is None:
+            bundle = self._bundle()
+            if name in bundle.get("content", {}):
+                data = bundle["content"][name]
+                self.stamps[name] = bundle["sources"][name]
+            else:
+                data = self._load(name)
+            self.data[name] = data
+            self.versions.setdefault(name, 0)
+        return data
+
+    def version(self, name):
+        return self.versions.get(name, 0)
+
+    def poll(self, force=False):
+        """Reloads loaded files that were edited since they were read. Returns their names."""
+        now = time.monotonic()
+        if not force and (self.poll_interval is None or now < self.next_poll):
+            return []
+        self.next_poll = now + (self.poll_interval or 0)
+
+        reloaded = []
+        for name in list(self.data):
+            if file_stamp(self.files[name]) == self.stamps.get(name):
+                continue
+            previous = self.data[name]
+            data = self._load(name, previous)
+            if data is previous:
+                continue  # unreadable mid-edit; keep serving the old version
+            self.data[name] = data
+            self.versions[name] += 1
+            indexes = self._bundle().get("indexes", {})
+            for index, source in INDEX_SOURCES.items():
+                if source == name:
+                    indexes.pop(index, None)
+            reloaded.append(name)
+            for listener in self.listeners:
+                listener(name, data)
+        return reloaded
+
+    def index(self, name):
+        """A prebuilt index from the bundle, or None if there is no bundle."""
+        return self._bundle().get("indexes", {}).get(name)
+
+    def is_loaded(self, name):
+        return name in self.data
+
+    def invalidate(self, name=None):
+        """Forgets a parsed file (or all of them) so the next get() reads it again.
+
+        The bundle no longer matches once a file is rewritten, so it is dropped too.
+        """
+        self.bundle = {}
+        if name is None:
+            self.data.clear()
+        else:
+            self.data.pop(name, None)
+
+    def _load(self, name, previous=None):
+        """Parses a file. On failure returns previous, or {} on a first load."""
+        path = self.files[name]
+        started = time.perf_counter()
+        # Stamp before reading so an edit made during the read is seen by the next poll.
+        self.stamps[name] = stamp = file_stamp(path)
+        if stamp is None:
+            print(f"Warning: {path} not found.")
+            return previous if previous is not None else {}
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except json.JSONDecodeError:
+            if previous is not None:
+                print(f"Error decoding {path}. Keeping the version already loaded.")
+                return previous
+            print(f"Error decoding {path}. Using empty {name}.")
+            return {}
+        self.timings[name] = (stamp[0], time.perf_counter() - started)
+        return data
+
+    def stats(self):
+        return [
+            {"name": name, "path": self.files.get(name, self.bundle_path), "size": size, "seconds": seconds}
+            for name, (size, seconds) in self.timings.items()
+        ]
+
+    def report(self):
+        stats = self.stats()
+        if not stats:
+            print("No content loaded yet.")
+        for entry in stats:
+            print(f" - {entry['name']}: {entry['path']} ({entry['size']} bytes, {entry['seconds'] * 1000:.2f} ms)")
+
+
+CONTENT = ContentRegistry()
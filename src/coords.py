@@ -0,0 +1,114 @@
+# coords.py — Compact ship coordinates
+import re
+
+_LABEL_RE = re.compile(r"^\s*([A-Za-z]+)\s*(-?\d+)\s*(?:@\s*(-?\d+)\s*)?$")
+
+DIRECTIONS = {
+    "bow": (0, 1),
+    "stern": (0, -1),
+    "port": (-1, 0),
+    "starboard": (1, 0),
+}
+
+
+def column_label(index):
+    """Turns a 0-based column index into its map label: A..Z, AA, AB, ..."""
+    label = ""
+    index += 1
+    while index > 0:
+        index, rem = divmod(index - 1, 26)
+        label = chr(ord("A") + rem) + label
+    return label
+
+
+def column_index(label):
+    """Turns a column label such as 'J' or 'AB' back into a 0-based index."""
+    index = 0
+    for char in label.upper():
+        index = index * 26 + (ord(char) - ord("A") + 1)
+    return index - 1
+
+
+class Coord(tuple):
+    """A ship cell as an (x, y, z) triple of ints.
+
+    x is the 0-based column, y the row number used on the map and z the
+    deck (0 is the main deck). Being a tuple subclass with no instance dict
+    keeps it small and hashable, and neighbour arithmetic is plain integer
+    math, so ships can be as wide as needed. Coords print with their map
+    label, e.g. J10, AB3, or J10@1 on deck 1.
+    """
+    __slots__ = ()
+
+    def __new__(cls, x, y, z=0):
+        return tuple.__new__(cls, (x, y, z))
+
+    @property
+    def x(self):
+        return self[0]
+
+    @property
+    def y(self):
+        return self[1]
+
+    @property
+    def z(self):
+        return self[2]
+
+    def offset(self, dx, dy, dz=0):
+        return Coord(self[0] + dx, self[1] + dy, self[2] + dz)
+
+    @property
+    def label(self):
+        label = f"{column_label(self[0])}{self[1]}"
+        if self[2]:
+            label += f"@{self[2]}"
+        return label
+
+    def __repr__(self):
+        return self.label
+
+    def __str__(self):
+        return self.label
+
+    def __getnewargs__(self):
+        return (self[0], self[1], self[2])
+
+    @classmethod
+    def parse(cls, text, z=0):
+        """Parses a label like 'J10' or 'J10@1' (case-insensitive). Returns None if invalid.
+
+        z is the deck used when the label does not name one.
+        """
+        match = _LABEL_RE.match(text)
+        if not match:
+            return None
+        deck = int(match.group(3)) if match.group(3) is not None else z
+        return cls(column_index(match.group(1)), int(match.group(2)), deck)
+
+    @classmethod
+    def coerce(cls, value, z=0):
+        """Accepts a Coord, a label string, a legacy ('J', 10) pair or an (x, y[, z]) int tuple.
+
+        z is the deck used when the value does not name one.
+        """
+        if isinstance(value, Coord):
+            return value
+        if isinstance(value, str):
+            coord = cls.parse(value, z)
+            if coord is None:
+                raise ValueError(f"Invalid coordinate: {value!r}")
+            return coord
+        if len(value) == 3:
+            x, y, z = value
+        else:
+            x, y = value
+        if isinstance(x, str):
+            return cls(column_index(x), int(y), int(z))
+        return cls(int(x), int(y), int(z))
+
+
+def step(position, direction, count=1):
+    """Returns the coordinate `count` cells away from position in a direction."""
+    dx, dy = DIRECTIONS[direction]
+    return position.offset(dx * count, dy * count)
@@ -0,0 +1,168 @@
+# decks.py — Extra decks, loaded from data/decks/ when the player gets near them
+import json
+import os
+import weakref
+from collections import OrderedDict
+
+from src.inventory import current_items
+from src.session import SESSION
+from src.ship import DOOR_GRAPH, SHIP_MAP, add_rooms, current_overlay, get_room, remove_rooms
+
+DECKS_DIR = os.path.join("data", "decks")
+
+# How many extra decks may stay in memory besides the main deck (SHIP_MAP).
+MAX_RESIDENT_DECKS = 2
+
+
+class DeckManager:
+    """Loads deck files into SHIP_MAP on demand and evicts idle ones.
+
+    Deck 0 is the main deck defined in src/ship.py and is always present.
+    Deck n lives in data/decks/deck_<n>.json and is loaded the first time the
+    player stands in a room with a ladder leading to it, or arrives on it.
+    Once more than max_resident extra decks are loaded, the least recently
+    visited one is dropped again, unless a session is standing on it.
+
+    Residency is shared, but catching up with a (re)loaded deck is done per
+    session: the first time a session reaches a deck after it was loaded,
+    its items go back into the session's compartments and the door flags
+    its save holds for that deck are restored through DOOR_GRAPH, so they
+    land in the session's ShipOverlay. Door changes a session made earlier
+    stay in its overlay's copies of the rooms while the deck is away.
+    Outside a session this manager keeps that bookkeeping itself.
+    """
+
+    def __init__(self, decks_dir=DECKS_DIR, max_resident=MAX_RESIDENT_DECKS):
+        self.decks_dir = decks_dir
+        self.max_resident = max_resident
+        self.resident = OrderedDict()  # deck -> room names, least recently used first
+        self.names = {0: "Main Deck"}
+        self.loads = {}                # deck -> times it was loaded
+        self.standing = weakref.WeakKeyDictionary()  # SessionState -> deck it is on
+        self.deck_doors = {}           # (room, label) -> saved lock/reveal flags, outside a session
+        self.deck_loads = {}           # deck -> load caught up with, outside a session
+        self.missing = set()
+
+    def deck_file(self, z):
+        return os.path.join(self.decks_dir, f"deck_{z}.json")
+
+    def is_resident(self, z):
+        return z == 0 or z in self.resident
+
+    def deck_name(self, z):
+        return self.names.get(z, f"Deck {z}")
+
+    def _view(self):
+        """Where the current session keeps deck_doors and deck_loads: its SessionState, or self."""
+        session = SESSION.get()
+        return self if session is None else session
+
+    def remember_door(self, room, label, state):
+        """Keeps saved flags for a door on a deck that is not loaded, for the current session."""
+        self._view().deck_doors[(room, label)] = state
+
+    def pending_doors(self):
+        """{(room, label): flags} the current session has for doors missing from its view of the graph.
+
+        Those are the doors unload() and remember_door() kept for decks the
+        session has not caught up with, and doors the session changed itself
+        on an evicted deck, which stay in its ShipOverlay's room copies.
+        """
+        doors = {}
+        overlay = current_overlay()
+        if overlay is not None:
+            for room, group, label in overlay.own_links:
+                if room not in SHIP_MAP:
+                    data = overlay.rooms[room][group][label]
+                    doors[(room, label)] = {key: data[key] for key in ("locked", "revealed") if key in data}
+        doors.update(self._view().deck_doors)
+        return doors
+
+    def ensure(self, z, keep=()):
+        """Makes sure deck z is loaded. Returns False if it has no usable data file."""
+        if z == 0:
+            return True
+        if z in self.resident:
+            self.resident.move_to_end(z)
+        elif not self._load(z, keep):
+            return False
+        self._catch_up(z)
+        return True
+
+    def _load(self, z, keep):
+        if z in self.missing:
+            return False
+
+        path = self.deck_file(z)
+        if not os.path.exists(path):
+            self.missing.add(z)
+            return False
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except json.JSONDecodeError as e:
+            print(f"Error loading {path}: {e}")
+            self.missing.add(z)
+            return False
+
+        rooms = data.get("rooms", {})
+        clashes = [name for name in rooms if name in SHIP_MAP]
+        if clashes:
+            print(f"Deck {z} reuses room names already on the ship: {', '.join(clashes)}")
+            self.missing.add(z)
+            return False
+
+        add_rooms(rooms, z)
+        self.names[z] = data.get("name", f"Deck {z}")
+        self.resident[z] = list(rooms)
+        self.loads[z] = self.loads.get(z, 0) + 1
+        self._evict(keep={z, *keep})
+        return True
+
+    def _catch_up(self, z):
+        """Brings the current session's items and saved door flags onto a freshly loaded deck."""
+        view = self._view()
+        if view.deck_loads.get(z) == self.loads[z]:
+            return
+        view.deck_loads[z] = self.loads[z]
+        room_names = set(self.resident[z])
+        current_items().attach_rooms(room_names)
+        for room, label in [key for key in view.deck_doors if key[0] in room_names]:
+            DOOR_GRAPH.restore(room, label, view.deck_doors.pop((room, label)))
+
+    def _evict(self, keep):
+        keep = {*keep, *self.standing.values()}
+        while len(self.resident) > self.max_resident:
+            victim = next((z for z in self.resident if z not in keep), None)
+            if victim is None:
+                break
+            self.unload(victim)
+
+    def unload(self, z):
+        """Drops a deck's rooms from SHIP_MAP, remembering their door state for the current session."""
+        room_names = set(self.resident.pop(z, []))
+        deck_doors = self._view().deck_doors
+        for (room, label), link in DOOR_GRAPH.links.items():
+            if room in room_names:
+                data = link.data
+                deck_doors[(room, label)] = {
+                    key: data[key] for key in ("locked", "revealed") if key in data
+                }
+        remove_rooms(room_names)
+
+    def visit(self, position):
+        """Keeps the player's deck loaded and prefetches decks reachable by ladder."""
+        session = SESSION.get()
+        if session is not None:
+            self.standing[session] = position.z
+        self.ensure(position.z)
+        _, room_data = get_room(position)
+        if not room_data:
+            return
+        for ladder in room_data.get("ladders", {}).values():
+            exit_ = ladder.get("exit")
+            if exit_ is not None:
+                self.ensure(exit_.z, keep=(position.z,))
+
+
+DECKS = DeckManager()
@@ -0,0 +1,139 @@
+# dialogue.py — Compiled dialogue index: lookups by id, priority order, trigger buckets
+from bisect import insort
+
+from src.conditions import ConditionError, ConditionState, compile_condition, simple_task
+from src.content import CONTENT
+
+
+def room_key(room_name):
+    """'Engine Room' -> 'engine_room', the form used in dialogue.json and logs.json."""
+    return room_name.lower().replace(" ", "_")
+
+
+class DialogueIndex:
+    """Compiled form of dialogue.json, rebuilt whenever the file is reloaded.
+
+    Each (character, room) has its lines sorted by priority (lowest first,
+    file order breaking ties), and the positions in that list are bucketed
+    by trigger. A player's candidate lines for a room are kept in a sorted
+    list; when tasks are completed only the buckets of those tasks are
+    merged in, instead of re-scanning the room.
+
+    A trigger that is more than a task name is a condition (see
+    src.conditions), compiled here once; its line is always a candidate
+    and the compiled check runs when the line's turn comes.
+    """
+
+    def __init__(self, content=CONTENT):
+        self.content = content
+        self.by_id = {}
+        self.lines = {}         # (character, room) -> lines by priority
+        self.by_trigger = {}    # (character, room) -> trigger -> positions
+        self.untriggered = {}   # (character, room) -> positions always available
+        self.conditions = {}    # (character, room) -> position -> compiled condition
+        self.version = None
+
+    def _fresh(self):
+        version = self.content.version("dialogue")
+        if version != self.version:
+            self.rebuild(self.content.get("dialogue"))
+            self.version = version
+
+    def rebuild(self, dialogue_data):
+        self.by_id = {}
+        self.lines = {}
+        self.by_trigger = {}
+        self.untriggered = {}
+        self.conditions = {}
+        for character, rooms in dialogue_data.items():
+            for room, room_lines in rooms.items():
+                key = (character, room)
+                ordered = sorted(room_lines, key=lambda line: line.get("priority", 0))
+                self.lines[key] = ordered
+                buckets = self.by_trigger[key] = {}
+                always = self.untriggered[key] = []
+                checks = self.conditions[key] = {}
+                for position, line in enumerate(ordered):
+                    if line.get("id") is not None:
+                        self.by_id[line["id"]] = line
+                    trigger = line.get("trigger")
+                    if not trigger:
+                        always.append(position)
+                        continue
+                    try:
+                        task = simple_task(trigger)
+                        if task is not None:
+                            buckets.setdefault(task, []).append(position)
+                            continue
+                        checks[position] = compile_condition(trigger)
+                    except ConditionError as e:
+                        print(f"Dialogue for {character} in {room}: {e}. The line is skipped.")
+                        continue
+                    always.append(position)
+
+    def line_by_id(self, dialogue_id):
+        """The line with this id, or None.
+
+        With a current bundle the line is found through its prebuilt
+        dialogue_by_id index, without compiling the dialogue first.
+        """
+        where = self.content.index("dialogue_by_id")
+        if where is not None:
+            if dialogue_id not in where:
+                return None
+            character, room, index = where[dialogue_id]
+            return self.content.get("dialogue")[character][room][index]
+        self._fresh()
+        return self.by_id.get(dialogue_id)
+
+    def _candidates(self, key, completed_tasks, cursors):
+        """Sorted positions of lines whose trigger is met, updated incrementally."""
+        cursor = cursors.get(key)
+        if cursor is None or cursor["tasks"] is not completed_tasks or cursor["version"] != self.version:
+            positions = list(self.untriggered.get(key, []))
+            buckets = self.by_trigger.get(key, {})
+            for task in set(completed_tasks):
+                positions.extend(buckets.get(task, []))
+            positions.sort()
+            cursor = cursors[key] = {
+                "tasks": completed_tasks,
+                "seen": len(completed_tasks),
+                "version": self.version,
+                "positions": positions,
+            }
+        elif cursor["seen"] < len(completed_tasks):
+            buckets = self.by_trigger.get(key, {})
+            for task in completed_tasks[cursor["seen"]:]:
+                for position in buckets.get(task, []):
+                    insort(cursor["positions"], position)
+            cursor["seen"] = len(completed_tasks)
+        return cursor["positions"]
+
+    def next_line(self, character, room_name, completed_tasks, flags, cursors, state=None):
+        """The highest-priority line that can play now, or None.
+
+        completed_tasks is treated as append-only; cursors is a dict the
+        caller keeps per player to hold its candidate lists. state is the
+        ConditionState for compound triggers.
+        """
+        self._fresh()
+        key = (character, room_key(room_name))
+        lines = self.lines.get(key)
+        if not lines:
+            return None
+        if state is None:
+            state = ConditionState(tasks=completed_tasks, flags=flags)
+        checks = self.conditions.get(key, {})
+        for position in self._candidates(key, completed_tasks, cursors):
+            check = checks.get(position)
+            if check is not None and not check(state):
+                continue
+            line = lines[position]
+            flag = line.get("flag")
+            if flag and flag in flags and not line.get("repeatable", False):
+                continue
+            return line
+        return None
+
+
+DIALOGUE_INDEX = DialogueIndex()
@@ -1,5 +1,5 @@
 # enemy.py — Defines enemy behavior and types
-import random
+from .replay import RNG
 
 class Enemy:
     def __init__(self, name, health, attack_power, enemy_type):
@@ -12,9 +12,9 @@ class Enemy:
         """Check if the enemy is still alive."""
         return self.health > 0
 
-    def attack(self):
+    def attack(self, rng=RNG):
         """Perform an attack with randomized power."""
-        return random.randint(1, self.attack_power)
+        return rng.randint(1, self.attack_power)
 
     def take_damage(self, damage):
         """Apply damage and return updated health."""
@@ -48,6 +48,6 @@ class Stalker(Enemy):
             enemy_type="stalker"
         )
 
-    def ryan_chance_to_win(self):
+    def ryan_chance_to_win(self, rng=RNG):
         """25% chance for Ryan to win against The Stalker."""
-        return random.random() < 0.25
+        return rng.random() < 0.25
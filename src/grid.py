@@ -0,0 +1,172 @@
+# grid.py — Array-backed occupancy grid built from SHIP_MAP
+from array import array
+
+from src.coords import DIRECTIONS, Coord
+from src.ship import room_data
+
+
+def _bitmap(size):
+    return bytearray((size + 7) // 8)
+
+
+def _set_bit(bits, i):
+    bits[i >> 3] |= 1 << (i & 7)
+
+
+def _get_bit(bits, i):
+    return bits[i >> 3] >> (i & 7) & 1
+
+
+class ShipGrid:
+    """Compact alternative to RoomIndex for very large ships.
+
+    Cells are stored deck by deck and row by row in one array of room ids
+    (0 means no room), with bitmaps for door cells, passage cells and walls,
+    and one array of straight-line run lengths per direction. It answers the same questions
+    as RoomIndex, so get_room, Player.move, vision and the map can use
+    either. SHIP_MAP stays the authoring format; the grid is derived from it.
+    """
+
+    def __init__(self, ship_map):
+        self.ship_map = ship_map
+        self.room_names = [None]
+        self.room_ids = {}
+        self.cells = array("H")
+        self.runs = {}
+        self.door_bits = bytearray()
+        self.passage_bits = bytearray()
+        self.wall_bits = bytearray()
+        self.bounds = (0, 0, 0, 0)  # min_x, min_y, max_x, max_y
+        self.width = 0
+        self.height = 0
+        self.min_z = 0
+        self.depth = 0
+        self.room_count = -1
+        self.version = 0
+        self.rebuild()
+
+    def rebuild(self):
+        rooms = [(room, data) for room, data in self.ship_map.items() if data.get("coords")]
+        all_coords = [c for _, data in rooms for c in data["coords"]]
+        if all_coords:
+            xs = [c.x for c in all_coords]
+            ys = [c.y for c in all_coords]
+            zs = [c.z for c in all_coords]
+            self.bounds = (min(xs), min(ys), max(xs), max(ys))
+            self.min_z, max_z = min(zs), max(zs)
+        else:
+            self.bounds = (0, 0, -1, -1)
+            self.min_z, max_z = 0, -1
+        min_x, min_y, max_x, max_y = self.bounds
+        self.width = max_x - min_x + 1
+        self.height = max_y - min_y + 1
+        self.depth = max_z - self.min_z + 1
+        size = self.width * self.height * self.depth
+
+        self.room_names = [None] + [room for room, _ in rooms]
+        self.room_ids = {room: i for i, room in enumerate(self.room_names) if room}
+        typecode = "H" if len(self.room_names) <= 0xFFFF else "I"
+        cells = array(typecode, bytes(size * array(typecode).itemsize))
+        for room, data in rooms:
+            room_id = self.room_ids[room]
+            for coord in data["coords"]:
+                i = self._index(coord)
+                if not cells[i]:  # first room listing a cell owns it
+                    cells[i] = room_id
+        self.cells = cells
+
+        self.door_bits = _bitmap(size)
+        self.passage_bits = _bitmap(size)
+        self.wall_bits = _bitmap(size)
+        for data in self.ship_map.values():
+            for group, bits in (("doors", self.door_bits), ("secret_passages", self.passage_bits)):
+                for link in data.get(group, {}).values():
+                    for end in (link.get("entry"), link.get("exit")):
+                        i = self._index(end) if end is not None else None
+                        if i is not None:
+                            _set_bit(bits, i)
+        for i in range(size):
+            if not cells[i]:
+                _set_bit(self.wall_bits, i)
+
+        self.runs = {direction: self._build_runs(direction) for direction in DIRECTIONS}
+        self.room_count = len(self.ship_map)
+        self.version += 1
+
+    def _index(self, position):
+        x = position.x - self.bounds[0]
+        y = position.y - self.bounds[1]
+        z = position.z - self.min_z
+        if 0 <= x < self.width and 0 <= y < self.height and 0 <= z < self.depth:
+            return (z * self.height + y) * self.width + x
+        return None
+
+    def _build_runs(self, direction):
+        dx, dy = DIRECTIONS[direction]
+        width, height, cells = self.width, self.height, self.cells
+        runs = array("I", bytes(len(cells) * 4))
+        # Visit cells so that the neighbour in `direction` is always done first.
+        xs = range(width - 1, -1, -1) if dx > 0 else range(width)
+        ys = range(height - 1, -1, -1) if dy > 0 else range(height)
+        for z in range(self.depth):
+            deck = z * height
+            for y in ys:
+                ny = y + dy
+                for x in xs:
+                    i = (deck + y) * width + x
+                    room_id = cells[i]
+                    nx = x + dx
+                    if room_id and 0 <= nx < width and 0 <= ny < height:
+                        j = (deck + ny) * width + nx
+                        if cells[j] == room_id:
+                            runs[i] = runs[j] + 1
+        return runs
+
+    def _fresh(self):
+        if len(self.ship_map) != self.room_count:
+            self.rebuild()
+
+    def in_bounds(self, position):
+        return self._index(position) is not None
+
+    def room_name_at(self, position):
+        self._fresh()
+        i = self._index(position)
+        if i is None:
+            return None
+        return self.room_names[self.cells[i]]
+
+    def lookup(self, position):
+        room = self.room_name_at(position)
+        if room is None:
+            return None, None
+        return room, room_data(room)
+
+    def run_length(self, position, direction):
+        self._fresh()
+        i = self._index(position)
+        return self.runs[direction][i] if i is not None else 0
+
+    def is_door(self, position):
+        i = self._index(position)
+        return i is not None and bool(_get_bit(self.door_bits, i))
+
+    def is_passage(self, position):
+        i = self._index(position)
+        return i is not None and bool(_get_bit(self.passage_bits, i))
+
+    def is_wall(self, position):
+        i = self._index(position)
+        return i is not None and bool(_get_bit(self.wall_bits, i))
+
+    def cells_of(self, room_name):
+        """Every cell owned by a room, in row order, as a list like RoomIndex.cells_of."""
+        room_id = self.room_ids.get(room_name)
+        min_x, min_y = self.bounds[0], self.bounds[1]
+        cells = []
+        for i, cell in enumerate(self.cells):
+            if cell == room_id:
+                row, x = divmod(i, self.width)
+                z, y = divmod(row, self.height)
+                cells.append(Coord(min_x + x, min_y + y, self.min_z + z))
+        return cells
@@ -1,4 +1,7 @@
 # inventory.py
+from src.coords import Coord
+from src.session import SESSION
+from src.ship import SHIP_MAP, get_room, iter_rooms, writable_room
 
 class Item:
     def __init__(self, name, category, description=""):
@@ -50,6 +53,114 @@ ITEM_CATALOG = {
 }
 
 
+class ItemIndex:
+    """Items lying around the ship, indexed by the cell they sit on.
+
+    Placing or removing an item also keeps the owning room's "compartment"
+    list in step, so every view of room contents agrees. Inside a session
+    that is the session's copy of the room (see ShipOverlay), and each
+    session has an index of its own; see current_items().
+    """
+
+    def __init__(self, ship_map):
+        self.ship_map = ship_map
+        self.by_cell = {}     # Coord -> {item name: Item}
+        self.locations = {}   # item name -> Coord
+        self.names = {}       # lower-case name -> item name
+        self.version = 0      # bumped on every change
+
+    def clear(self):
+        for room, room_data in iter_rooms():
+            if room_data.get("compartment"):
+                writable_room(room)["compartment"] = []
+        self.by_cell = {}
+        self.locations = {}
+        self.names = {}
+        self.version += 1
+
+    def load(self, item_positions, exclude=()):
+        """Indexes {room: {item name: coord}} plus any compartment items without a cell."""
+        compartments = {
+            room: list(data.get("compartment", [])) for room, data in iter_rooms()
+        }
+        self.clear()
+        for items in item_positions.values():
+            for item_name, coord in items.items():
+                if item_name in ITEM_CATALOG and item_name not in exclude:
+                    self.place(item_name, Coord.coerce(coord))
+        for room, items in compartments.items():
+            coords = self.ship_map[room].get("coords")
+            for item in items:
+                if coords and item.name not in self.locations and item.name not in exclude:
+                    self.place(item.name, coords[0])
+
+    def place(self, item_name, coord):
+        """Puts an item on a cell, moving it there if it was elsewhere."""
+        self.remove(item_name)
+        item = ITEM_CATALOG[item_name]
+        self.by_cell.setdefault(coord, {})[item_name] = item
+        self.locations[item_name] = coord
+        self.names[item_name.lower()] = item_name
+        self.version += 1
+        room, _ = get_room(coord)
+        if room is not None:
+            writable_room(room).setdefault("compartment", []).append(item)
+
+    def remove(self, item_name):
+        """Takes an item off the ship. Returns the cell it was on, or None."""
+        coord = self.locations.pop(item_name, None)
+        if coord is None:
+            return None
+        self.names.pop(item_name.lower(), None)
+        self.version += 1
+        cell_items = self.by_cell[coord]
+        item = cell_items.pop(item_name)
+        if not cell_items:
+            del self.by_cell[coord]
+        room, room_data = get_room(coord)
+        if room_data is not None and item in room_data.get("compartment", []):
+            writable_room(room)["compartment"].remove(item)
+        return coord
+
+    def attach_rooms(self, room_names):
+        """Refills the compartments of rooms that were just (re)loaded."""
+        room_names = set(room_names)
+        for item_name, coord in self.locations.items():
+            room, room_data = get_room(coord)
+            if room in room_names:
+                item = ITEM_CATALOG[item_name]
+                if item not in room_data.get("compartment", []):
+                    writable_room(room).setdefault("compartment", []).append(item)
+
+    def find(self, name):
+        """Case-insensitive lookup. Returns (item name, coord) or (None, None)."""
+        item_name = self.names.get(name.strip().lower())
+        if item_name is None:
+            return None, None
+        return item_name, self.locations[item_name]
+
+    def items_at(self, coord):
+        return list(self.by_cell.get(coord, {}).values())
+
+    def items_on(self, cells):
+        """Returns (coord, Item) pairs for every item on the given cells."""
+        found = []
+        for coord in cells:
+            cell_items = self.by_cell.get(coord)
+            if cell_items:
+                found.extend((coord, item) for item in cell_items.values())
+        return found
+
+    def positions(self):
+        """Returns the index as {room: {item name: coord}} for settings.json."""
+        item_positions = {}
+        for item_name, coord in self.locations.items():
+            room, _ = get_room(coord)
+            # Items on an evicted deck keep their cell; group them by deck.
+            item_positions.setdefault(room or f"Deck {coord.z}", {})[item_name] = coord
+        return item_positions
+
+
 def apply_item_effect(player, item, current_room_key=None, game_state=None):
     """
     Applies the effect of the item to the player or game state.
@@ -107,3 +218,16 @@ def apply_item_effect(player, item, current_room_key=None, game_state=None):
     # Keys or passive items
     print(f"{item.name} can't be used directly.")
     return False, None
+
+
+ITEM_INDEX = ItemIndex(SHIP_MAP)
+
+
+def current_items():
+    """The item index of the session running in this context, or ITEM_INDEX outside one."""
+    session = SESSION.get()
+    if session is None:
+        return ITEM_INDEX
+    if session.items is None:
+        session.items = ItemIndex(SHIP_MAP)
+    return session.items
@@ -0,0 +1,201 @@
+# journal.py — Append-only save journal with snapshot compaction
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+from src.session import SESSION
+
+JOURNAL_FILE = 'data/savegame.journal'
+
+# Compact the journal into a fresh snapshot after this many change records.
+SNAPSHOT_EVERY = 200
+
+
+def apply_record(state, record):
+    """Applies one change record to a save_game-style state dict in place."""
+    op = record["op"]
+    inventory = state.setdefault("inventory", [])
+    room_items = state.setdefault("room_items", {})
+
+    if op == "move":
+        state["position"] = record["to"]
+    elif op == "pickup":
+        item = record["item"]
+        for items in room_items.values():
+            if item in items:
+                items.remove(item)
+                break
+        inventory.append(item)
+    elif op == "drop":
+        if record["item"] in inventory:
+            inventory.remove(record["item"])
+        room_items.setdefault(record["room"], []).append(record["item"])
+    elif op == "consume":
+        if record["item"] in inventory:
+            inventory.remove(record["item"])
+    elif op == "store":
+        if record["item"] in inventory:
+            inventory.remove(record["item"])
+        state.setdefault("magic_storage", {}).setdefault(record["box"], []).append(record["item"])
+    elif op in ("unlock", "lock", "reveal"):
+        door = state.setdefault("doors", {}).setdefault(record["room"], {}).setdefault(record["door"], {})
+        if op == "reveal":
+            door["revealed"] = True
+        else:
+            door["locked"] = op == "lock"
+    elif op == "log":
+        logs = state.setdefault("overlay", {}).setdefault("logs", [])
+        if record["log"] not in logs:
+            logs.append(record["log"])
+    elif op == "line":
+        lines = state.setdefault("overlay", {}).setdefault("dialogue", {}).setdefault(record["room"], [])
+        if record["line"] not in lines:
+            lines.append(record["line"])
+    elif op == "task":
+        tasks = state.setdefault("completed_tasks", [])
+        if record["task"] not in tasks:
+            tasks.append(record["task"])
+    else:
+        raise ValueError(f"Unknown journal record: {op}")
+
+
+class Journal:
+    """Save file made of one JSON record per line.
+
+    The first line is a snapshot of the full save state and every later line
+    is a small change (move, pickup, drop, consume, store, unlock, lock, reveal,
+    task, log, line). Saving only appends and syncs, so its cost follows what changed.
+    Once SNAPSHOT_EVERY changes pile up, the file is rewritten as a single
+    new snapshot through a temporary file and an atomic rename. A torn last
+    line from a crash mid-append is ignored on replay.
+    """
+
+    def __init__(self, path=JOURNAL_FILE, snapshot_every=SNAPSHOT_EVERY):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.pending = 0        # records since the last snapshot
+        self.file = None
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def _open(self):
+        if self.file is None:
+            self.file = open(self.path, "a")
+        return self.file
+
+    def append(self, op, **fields):
+        record = {"op": op, **fields}
+        self._open().write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.pending += 1
+
+    def commit(self, full_state=None):
+        """Makes appended records durable; compacts when enough have piled up.
+
+        full_state is a callable returning the current save state, used for
+        the compaction snapshot.
+        """
+        if self.file is not None:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        if full_state is not None and self.pending >= self.snapshot_every:
+            self.snapshot(full_state())
+
+    def snapshot(self, state):
+        """Replaces the journal with a single snapshot record."""
+        self.close()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(json.dumps({"op": "snapshot", "state": state}, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.pending = 0
+
+    def replay(self):
+        """Rebuilds the save state from the last snapshot. Returns None if there is none."""
+        if not self.exists():
+            return None
+        with open(self.path, "r") as f:
+            lines = f.read().split("\n")
+
+        state = None
+        pending = 0
+        good_bytes = 0
+        for i, line in enumerate(lines):
+            if not line.strip():
+                good_bytes += len(line.encode()) + 1
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                if i >= len(lines) - 2:
+                    # Torn final write: cut it off so new records start on a clean line.
+                    with open(self.path, "r+b") as f:
+                        f.truncate(good_bytes)
+                    break
+                raise
+            good_bytes += len(line.encode()) + 1
+            if record["op"] == "snapshot":
+                state = record["state"]
+                pending = 0
+            elif state is not None:
+                apply_record(state, record)
+                pending += 1
+        self.pending = pending
+        return state
+
+    def attach(self, *sources):
+        """Records changes from objects with a listeners list (door graph, world, overlay).
+
+        Sources shared between sessions, like the door graph, get record_event,
+        which hands each change to the journal of the session that made it.
+        """
+        for source in sources:
+            if record_event not in source.listeners:
+                source.listeners.append(record_event)
+
+    def on_event(self, event, value):
+        if event == "task":
+            self.append("task", task=value)
+        elif event == "log":
+            self.append("log", log=value)
+        elif event == "line":
+            room_key, line = value
+            self.append("line", room=room_key, line=line)
+        else:
+            self.append(event, room=value.room, door=value.label)
+
+    @contextmanager
+    def scratch(self):
+        """Journals to a file in a temporary directory for the duration."""
+        path, pending = self.path, self.pending
+        self.close()
+        with tempfile.TemporaryDirectory() as tmp:
+            self.path = os.path.join(tmp, os.path.basename(path))
+            self.pending = 0
+            try:
+                yield self
+            finally:
+                self.close()
+                self.path, self.pending = path, pending
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+JOURNAL = Journal()
+
+def current_journal():
+    """The journal of the session running in this context, or JOURNAL outside one."""
+    session = SESSION.get()
+    if session is None or session.journal is None:
+        return JOURNAL
+    return session.journal
+
+
+def record_event(event, value):
+    current_journal().on_event(event, value)
@@ -1,18 +1,34 @@
+import argparse
+import contextlib
 import json
 import os
-import random
-from src.ship import get_room, get_room_dialogue, load_dialogue, SHIP_MAP
+import sys
+import time
+from src.ship import (get_room, get_room_dialogue, load_dialogue, iter_rooms, room_data,
+                      writable_room, SHIP_MAP, DOOR_GRAPH)
+from src.decks import DECKS
 from src.player import Player
-from src.inventory import ITEM_CATALOG
-from src.puzzles import load_puzzles, get_random_puzzle, is_correct_answer
+from src.navigation import route_to
+from src.world import WorldState
+from src.journal import current_journal
+from src.inventory import ITEM_CATALOG, current_items
+from src.puzzles import (load_puzzles, get_random_puzzle, is_correct_answer, is_puzzle_solved,
+                         mark_puzzle_solved, unlock_related_content, check_puzzle_trigger,
+                         current_puzzle_progress)
+from src.conditions import ConditionState
+from src.storage import current_storage
+from src.overlay import current_content_overlay
+from src.content import CONTENT
+from src.dialogue import DIALOGUE_INDEX
+from src.commands import CommandRegistry, STOP
+from src.replay import RNG, Recorder, SessionRandom, load_replay, save_replay
 from src.ui import generate_map, show_ascii_art  # <-- new import
 
-SAVE_FILE = 'data/savegame.json'
-SETTINGS_FILE = 'data/settings.json'
-puzzles = load_puzzles()
+# "json" rewrites the save in storage on every save; "journal" appends changes to a Journal.
+SAVE_MODE = os.environ.get("FORGOTTEN_SHIP_SAVE_MODE", "json")
 
 
-def generate_item_placement():
+def generate_item_placement(rng=RNG):
     """Logically and randomly place items in valid ship rooms with constraints."""
     item_positions = {}
 
@@ -39,7 +55,7 @@ def generate_item_placement():
 
     # Shuffle room list to aid distribution
     shuffled_rooms = list(valid_rooms.keys())
-    random.shuffle(shuffled_rooms)
+    rng.shuffle(shuffled_rooms)
 
     for item_name, item_obj in ITEM_CATALOG.items():
         restricted_room = key_unlocks_room.get(item_name)
@@ -53,8 +69,8 @@ def generate_item_placement():
             print(f"[Warning] No eligible rooms found for item '{item_name}'. Skipping.")
             continue
 
-        selected_room = random.choice(eligible_rooms)
-        selected_coord = random.choice(valid_rooms[selected_room])
+        selected_room = rng.choice(eligible_rooms)
+        selected_coord = rng.choice(valid_rooms[selected_room])
 
         if selected_room not in item_positions:
             item_positions[selected_room] = {}
@@ -63,61 +79,21 @@ def generate_item_placement():
 
     return item_positions
 
-def store_item_in_magic_box(self, item_name):
-    item = self.get_item_from_inventory(item_name)
-    if not item:
-        print(f"Item '{item_name}' not found in your inventory.")
-        return
-
-    box_name = input("Enter the magic box name: ")
-    if box_name not in self.magic_storage:
-        self.magic_storage[box_name] = []
-
-    self.magic_storage[box_name].append(item)
-    self.inventory.remove(item)
-    print(f"You stored {item_name} in the magic box '{box_name}'.")
-
-# Function for dropping items
-def drop_item(self, item_name):
-    item = self.get_item_from_inventory(item_name)
-    if not item:
-        print(f"Item '{item_name}' not found in your inventory.")
-        return
-    self.inventory.remove(item)
-    print(f"You dropped {item_name}.")
-
-def save_item_positions_to_settings(item_positions, visited_coords=None, completed_tasks=None):
-    """Save the randomly generated item positions and additional player state to settings.json."""
-    settings_data = {
-        "item_positions": item_positions,
-    }
-
-    # NEW: Add visited_coords and completed_tasks
-    if visited_coords is not None:
-        settings_data["visited_coords"] = visited_coords
-    if completed_tasks is not None:
-        settings_data["completed_tasks"] = completed_tasks
-
-    with open(SETTINGS_FILE, 'w') as settings_file:
-        json.dump(settings_data, settings_file, indent=4)
+def load_logs():
+    return CONTENT.get("logs")
 
-
-def load_logs(filepath="data/logs.json"):
-    if not os.path.exists(filepath):
-        print(f"Warning: {filepath} not found.")
-        return {}
-    with open(filepath, "r") as f:
-        return json.load(f)
-
-def save_game(player):
-    """Save the current game state to file."""
+def build_save_data(player):
+    """Collect the full game state that save_game persists."""
     save_data = {
-        "position": player.position,
+        "position": player.position.label,
         "inventory": [item.name for item in player.inventory],
         "room_items": {
             room: [item.name for item in data.get("compartment", [])]
-            for room, data in SHIP_MAP.items()
-        }
+            for room, data in iter_rooms()
+        },
+        "doors": {},
+        "completed_tasks": list(player.completed_tasks),
+        "overlay": current_content_overlay().to_dict(),
     }
 
     # Save magic storage if available
@@ -127,24 +103,70 @@ def save_game(player):
             for box, items in player.magic_storage.items()
         }
 
-    with open(SAVE_FILE, 'w') as f:
-        json.dump(save_data, f, indent=4)
+    for (room, label), link in DOOR_GRAPH.links.items():
+        state = {key: link.data[key] for key in ("locked", "revealed") if key in link.data}
+        if state:
+            save_data["doors"].setdefault(room, {})[label] = state
+    # Doors on evicted decks, or decks this session has not caught up with, wait in DECKS.
+    for (room, label), state in DECKS.pending_doors().items():
+        if state:
+            save_data["doors"].setdefault(room, {})[label] = state
+
+    return save_data
+
+def save_game(player):
+    """Save the current game state to file."""
+    if SAVE_MODE == "journal":
+        # Changes are already in the journal; make them durable and compact now and then.
+        journal = current_journal()
+        if journal.exists():
+            journal.commit(lambda: build_save_data(player))
+        else:
+            journal.snapshot(build_save_data(player))
+        print("Game saved.")
+        return
+
+    current_storage().write("save", build_save_data(player))
     print("Game saved.")
 
+def read_save_data():
+    """Return the saved game state, or None if there is no save yet."""
+    if SAVE_MODE == "journal":
+        save_data = current_journal().replay()
+        if save_data is not None:
+            return save_data
+    return current_storage().read("save")
+
+def list_save_slots():
+    """Print the saved slots of the current profile."""
+    slots = current_storage().list_slots()
+    if not slots:
+        print("No saved games.")
+        return
+    for entry in slots:
+        updated = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["updated"]))
+        print(f" - {entry['profile']} / slot {entry['slot']}: {entry['kind']} ({entry['size']} bytes, {updated})")
+
+def restore_doors(doors):
+    """Apply saved lock/reveal flags to the door graph."""
+    for room, labels in doors.items():
+        for label, state in labels.items():
+            if not DOOR_GRAPH.restore(room, label, state):
+                # Room on a deck that is not loaded yet.
+                DECKS.remember_door(room, label, state)
+
 def load_game():
     """Load the game state from file or start a new game if invalid."""
-    if not os.path.exists(SAVE_FILE):
-        print("No save game found. Starting new game.")
-        return Player()
-
     try:
-        with open(SAVE_FILE, 'r') as f:
-            save_data = json.load(f)
+        save_data = read_save_data()
+        if save_data is None:
+            print("No save game found. Starting new game.")
+            return Player()
 
         if "position" not in save_data or "inventory" not in save_data:
             raise KeyError("Save file is missing required data. Starting new game.")
 
-        player = Player(position=tuple(save_data["position"]))
+        player = Player(position=save_data["position"])
 
         # Initialize magic_storage even if empty
         player.magic_storage = {}
@@ -171,335 +193,557 @@ def load_game():
                     player.magic_storage[box_name].append(item_obj)
 
         for room, item_list in save_data.get("room_items", {}).items():
-            SHIP_MAP[room]["compartment"] = []
-            for item_entry in item_list:
-                item_obj = get_item_by_name(item_entry)
-                if item_obj:
-                    SHIP_MAP[room]["compartment"].append(item_obj)
+            if room not in SHIP_MAP:
+                continue  # room on a deck that is not loaded yet
+            compartment = [item for item in map(get_item_by_name, item_list) if item]
+            if compartment or room_data(room).get("compartment"):
+                writable_room(room)["compartment"] = compartment
+
+        restore_doors(save_data.get("doors", {}))
+        player.completed_tasks = list(save_data.get("completed_tasks", []))
+        current_content_overlay().load(save_data.get("overlay", {}))
 
         print("Game loaded.")
         return player
 
-    except (json.JSONDecodeError, KeyError, TypeError) as e:
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
         print(f"Error loading save file: {e}")
         print("Starting a new game instead.")
         return Player()
 
-def load_item_positions():
-    """Load the item positions and player state from settings.json."""
-    try:
-        with open(SETTINGS_FILE, 'r') as settings_file:
-            settings_data = json.load(settings_file)
-            return {
-                "item_positions": settings_data.get("item_positions", {}),
-                "visited_coords": settings_data.get("visited_coords", []),
-                "completed_tasks": settings_data.get("completed_tasks", []),
-            }
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {
-            "item_positions": {},
-            "visited_coords": [],
-            "completed_tasks": [],
-        }
-
-
 def display_map(player):
     """Display the map of the ship to help the player navigate."""
-    generate_map(player.position, player.explored_coords, player.doors_coords)
+    generate_map(player.position, player.explored_coords, player.doors_coords,
+                 visited_coords=player.visited_coords)
 
 
-def get_visible_coords(position, flashlight_on=False):
-    x, y = position
-    visible = []
-
-    # Convert x (a letter) to its index (A = 0, B = 1, etc.)
-    x_index = ord(x) - ord('A')  # A becomes 0, B becomes 1, and so on
-    y_index = y - 1  # Convert y to a 0-based index
-
-    # Define possible directions (dx, dy)
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # Left, Right, Up, Down
-
-    for dx, dy in directions:
-        new_x_index = x_index + dx
-        new_y_index = y_index + dy
-
-        # Ensure the new coordinates are within bounds (you can adjust the bounds as needed)
-        if 0 <= new_x_index < 10 and 0 <= new_y_index < 10:  # Assuming 10x10 grid
-            # Convert back the x_index to a letter
-            new_x = chr(new_x_index + ord('A'))
-            new_y = new_y_index + 1  # Convert back to 1-based y-coordinate
-            visible.append((new_x, new_y))
-
-    return visible
-
 def get_room_dialogue(room_name, log_data):
     key = room_name.lower().replace(" ", "_")
     room_info = log_data.get("rooms", {}).get(key, {})
     description = room_info.get("description", "No description available.")
-    dialogue = room_info.get("dialogue", [])
+    dialogue = current_content_overlay().room_dialogue(key, room_info.get("dialogue", []))
     return description, dialogue
 
-def process_room_dialogue(player, room_name, dialogue_data):
-    """Display the first valid dialogue line based on triggers, flags, and repetition rules."""
-    character_dialogue = dialogue_data.get(player.name.lower(), {})
-    room_dialogues = character_dialogue.get(room_name, [])
-
-    for line in room_dialogues:
-        trigger = line.get("trigger")
-        flag = line.get("flag")
-        repeatable = line.get("repeatable", False)
-
-        if trigger and trigger not in player.completed_tasks:
-            continue
-
-        if flag and flag in player.dialogue_flags and not repeatable:
-            continue
-
-        print(f"{player.name}: {line['line']}")
+def condition_state(player, world):
+    """Set-backed view of the player's progress for trigger conditions."""
+    return ConditionState(
+        tasks=world.completed,
+        items={item.name.lower() for item in player.inventory},
+        rooms=world.visited_rooms,
+        flags=player.dialogue_flags,
+        solved=current_puzzle_progress().solved,
+    )
+
+def process_room_dialogue(player, room_name, dialogue_data=None, state=None):
+    """Display the first valid dialogue line based on triggers, flags, priority and repetition rules.
+
+    Lines come from DIALOGUE_INDEX, which reads the shared dialogue content;
+    dialogue_data is accepted for older callers and not used.
+    """
+    line = DIALOGUE_INDEX.next_line(player.name.lower(), room_name, player.completed_tasks,
+                                    player.dialogue_flags, player.dialogue_cursors, state)
+    if line is None:
+        return
 
-        if flag:
-            player.dialogue_flags[flag] = True
+    print(f"{player.name}: {line['line']}")
 
-        break  # Only process one line per visit
+    flag = line.get("flag")
+    if flag:
+        player.dialogue_flags[flag] = True
 
 
 def trigger_dialogue_by_id(player, dialogue_data, dialogue_id):
     """Manually trigger a specific dialogue line by its unique ID."""
-    character_dialogue = dialogue_data.get(player.name.lower(), {})
-
-    for room_dialogues in character_dialogue.values():
-        for line in room_dialogues:
-            if line.get("id") == dialogue_id:
-                print(f"{player.name}: {line['line']}")
-                flag = line.get("flag")
-                if flag:
-                    player.dialogue_flags[flag] = True
-                return True  # Dialogue was found and triggered
-    return False  # No matching dialogue found
-
-def main():
-    dialogue_data = load_dialogue()         # character-specific dialogue (Ryan, Rachel)
-    log_data = load_logs()                  # intro, ship logs, room descriptions, alarms
-
-    player = load_game()
-
-    # Load from settings
-    settings = load_item_positions()
-    item_positions = settings["item_positions"]
-    player.visited_coords = settings["visited_coords"]
-    player.completed_tasks = settings["completed_tasks"]
-
-    # If no positions were previously saved, generate them
-    if not item_positions:
-        item_positions = generate_item_placement()
-        save_item_positions_to_settings(item_positions, player.visited_coords, player.completed_tasks)
-
-    print("Welcome to Forgotten Ship.")
-    print(log_data.get('intro', "Intro text not found."))
-    print("Type 'help' for available commands.\n")
-
-    while player.is_alive():
+    line = DIALOGUE_INDEX.line_by_id(dialogue_id)
+    if line is None:
+        return False  # No matching dialogue found
+
+    print(f"{player.name}: {line['line']}")
+    flag = line.get("flag")
+    if flag:
+        player.dialogue_flags[flag] = True
+    return True  # Dialogue was found and triggered
+
+class Game:
+    """One play session: the player, the world and what the loop carries between commands."""
+
+    def __init__(self, read_line=input, rng=None):
+        self.read_line = read_line              # input(), a ScriptInput, or None when driven by handle()
+        self.pending = None                     # callback waiting for an answer when read_line is None
+        self.rng = rng or SessionRandom()       # every random choice of the session comes from here
+        self.dialogue_data = load_dialogue()    # character-specific dialogue (Ryan, Rachel)
+        self.log_data = load_logs()             # intro, ship logs, room descriptions, alarms
+        # Content versions this game has seen; poll() reports a reload to one caller only.
+        self.content_versions = {name: CONTENT.version(name) for name in CONTENT.files}
+
+        self.player = load_game()
+        DECKS.visit(self.player.position)
+
+        # Load world state from settings once; it is kept in memory from here on.
+        # If no positions were previously saved, they are generated.
+        # Items already carried are not lying around the ship.
+        self.world = WorldState()
+        self.load_world()
+        current_puzzle_progress().load()
+
+        # In journal mode every change is appended as it happens; save only syncs.
+        self.journal = current_journal() if SAVE_MODE == "journal" else None
+        if self.journal:
+            if not self.journal.exists():
+                self.journal.snapshot(build_save_data(self.player))
+            self.journal.attach(DOOR_GRAPH, self.world, current_content_overlay())
+        self.last_position = self.player.position
+        self.last_room = None                   # room whose entry dialogue was last played
+
+    def load_world(self):
+        saved_tasks = self.player.completed_tasks
+        self.world.load(exclude={item.name for item in self.player.inventory}, generate=lambda: generate_item_placement(self.rng))
+        for task in saved_tasks:
+            self.world.complete_task(task)
+        self.player.visited_coords = self.world.visited_coords
+        self.player.completed_tasks = self.world.completed_tasks
+
+    def ask(self, prompt, callback):
+        """Asks the player something and passes the stripped answer to callback.
+
+        Without read_line the prompt is printed and the next line given to
+        handle() is the answer, so a session never blocks waiting for it.
+        """
+        if self.read_line is None:
+            print(prompt, end="")
+            self.pending = callback
+            return
+        callback(self.read_line(prompt).strip())
+
+    def waiting(self):
+        """True while a question from ask() has not been answered yet."""
+        return self.pending is not None
+
+    def record(self, op, **fields):
+        if self.journal:
+            self.journal.append(op, **fields)
+
+    def before_command(self):
+        """Per-turn upkeep: write-behind, content reload, visit and move tracking."""
+        self.world.tick()
+        CONTENT.poll()
+        reloaded = [name for name, version in self.content_versions.items() if CONTENT.version(name) != version]
+        if reloaded:
+            print(f"[Content reloaded: {', '.join(reloaded)}]")
+            self.dialogue_data = load_dialogue()
+            self.log_data = load_logs()
+            self.content_versions = {name: CONTENT.version(name) for name in CONTENT.files}
+        self.world.mark_visited(self.player.position)
+        if self.player.position != self.last_position:
+            self.record("move", to=self.player.position.label)
+        self.last_position = self.player.position
+
+    def describe_room(self):
+        """Prints where the player is. Returns False if they are outside every room."""
+        player = self.player
         room_name, room_data = get_room(player.position)
 
         if not room_data:
             print(f"You are floating in space. No room found at {player.position}.")
-            break
+            return False
 
-        description, room_dialogue = get_room_dialogue(room_name, log_data)
-        item_positions = load_item_positions()
+        description, room_dialogue = get_room_dialogue(room_name, self.log_data)
 
-        # --- NEW: Field-of-view item filtering ---
-        visible_items = {}
-        if room_name == player.get_current_room_name():
-            visible_items = item_positions.get(room_name, {})
-        else:
-            visible_coords = get_visible_coords(player.position, flashlight_on=player.has_flashlight)
-            room_items = item_positions.get(room_name, {})
-            visible_items = {
-                name: pos for name, pos in room_items.items() if pos in visible_coords
-            }
+        # --- Field-of-view item filtering ---
+        visible_items = {
+            item.name: coord for coord, item in current_items().items_on(player.get_visible_tiles())
+        }
 
         # Show ASCII art on entry conditionally
-        if random.random() < 0.2:
+        if self.rng.random() < 0.2:
             show_ascii_art("01")
 
         print(f"\nYou are in: {room_name}")
         print(f"Description: {description}")
         if visible_items:
             print(f"Items found: {', '.join(visible_items.keys())}")
-            print(f"Compartment contains: {', '.join([item.name for item in room_data['compartment']])}")
+            print(f"Compartment contains: {', '.join([item.name for item in room_data.get('compartment', [])])}")
         if room_dialogue:
             print("Dialogue:")
             for line in room_dialogue:
                 print(f"- {line}")
+        if room_name != self.last_room:
+            # Entering a room plays the character's best line for it, if one is due.
+            self.last_room = room_name
+            process_room_dialogue(player, room_name, state=condition_state(player, self.world))
+        return True
+
+    def handle(self, line):
+        """Runs one command line. Returns False once the game should stop."""
+        if self.pending is not None:
+            callback, self.pending = self.pending, None
+            callback(line.strip())
+            return True
+        return COMMANDS.dispatch(self, line.strip().lower()) is not STOP
+
+    def save(self):
+        with current_storage().transaction():
+            save_game(self.player)
+            self.world.flush()
+            current_puzzle_progress().flush()
+
+    def close(self):
+        """Saves everything and closes the journal: what quit and the end of input both do."""
+        self.save()
+        if self.journal:
+            self.journal.close()
+
+
+COMMANDS = CommandRegistry()
+
+
+@COMMANDS.command("look", aliases=("l",))
+def look_command(game):
+    game.player.look()
+
+
+@COMMANDS.command("move", "direction:direction [steps:int]",
+                  usage="move [direction] [steps] (e.g., move bow 3)", aliases=("walk",))
+def move_command(game, direction, steps=1):
+    game.player.move(direction, steps)
+    room_name, _ = get_room(game.player.position)
+    check_puzzle_trigger(game.player, "move", room_name, condition_state(game.player, game.world))
+
+
+@COMMANDS.command("goto", "target:text", usage="goto [room name or cell] (e.g., goto med bay, goto j10)")
+def goto_command(game, target):
+    route = route_to(game.player, target)
+    if route is None:
+        print(f"You can't find a way to {target}.")
+    else:
+        game.player.follow_route(route)
+
+
+@COMMANDS.command("use", "item_name:text", usage="use [item name]")
+def use_command(game, item_name):
+    held = list(game.player.inventory)
+    updates = game.player.use_item(item_name)
+    for item in held:
+        if item not in game.player.inventory:
+            game.record("consume", item=item.name)
+    for task, done in (updates or {}).items():
+        if done:
+            game.world.complete_task(task)
+    check_puzzle_trigger(game.player, "use_item", item_name, condition_state(game.player, game.world))
+
+
+@COMMANDS.command("pickup", "item_name:text", usage="pickup [item name]", aliases=("take", "get"))
+def pickup_command(game, item_name):
+    item = game.player.pickup_item(item_name)
+    if item:
+        game.record("pickup", item=item.name)
 
-        command = input("\nEnter command: ").strip().lower()
-
-        if command == "look":
-            current_room = player.get_current_room()
-            print(f"\nYou look around the room. {current_room['description']}")
-            if current_room.get("items"):
-                print(f"Items found: {', '.join(current_room['items'])}")
-            if 'exits' in current_room:
-                print(f"Exits: {', '.join(current_room.get('exits', []))}")
-            if current_room.get("compartment"):
-                print(f"Compartment contains: {', '.join(current_room['compartment'])}")
-            if room_dialogue:
-                print(f"Dialogue: {', '.join(room_dialogue)}")
-
-        elif command.startswith("move "):
-            parts = command.split()
-            if len(parts) == 2:
-                direction = parts[1]
-                player.move(direction)
-                room_name, _ = get_room(player.position)
-                from src.puzzles import check_puzzle_trigger
-                check_puzzle_trigger(player, "move", room_name)
-                save_item_positions_to_settings(item_positions, player.visited_coords, player.completed_tasks)
-            elif len(parts) == 3:
-                direction = parts[1]
-                try:
-                    steps = int(parts[2])
-                    player.move(direction, steps)
-                    room_name, _ = get_room(player.position)
-                    from src.puzzles import check_puzzle_trigger
-                    check_puzzle_trigger(player, "move", room_name)
-                except ValueError:
-                    print("Invalid number of steps. Please enter a valid integer.")
-            else:
-                print("Invalid command. Usage: move [direction] [steps]")
-
-        elif command == "inventory":
-            player.list_inventory()
-
-        elif command == "use door":
-            player.use_door()
-
-        elif command == "status":
-            player.status()
-
-        elif command == "reset":
-            confirm = input("Are you sure you want to reset the game? (yes/no): ").strip().lower()
-            if confirm == "yes":
-        # --- Reset savegame.json ---
-                blank_save = {
-                    "position": ["I", 5],
-                    "inventory": [],
-                    "magic_storage": {},
-                    "room_items": {
-                        room: [] for room in [
-                            "Bridge", "Server Room", "Weapons Room", "Engine Room", "Airlock", "Corridor",
-                            "Cargo Bay (Start)", "Sleeping Quarters 1", "Sleeping Quarters 2",
-                            "Sleeping Quarters 3", "Sleeping Quarters 4", "Chow Hall", "Med Bay",
-                            "Secret Passage 1", "Secret Passage 2", "Secret Passage 3"
-                        ]
-                    }
-                }
-                with open("data/savegame.json", "w") as f:
-                    json.dump(blank_save, f, indent=2)
-                print("Player savegame has been cleared.")
-
-        # --- Reset settings.json ---
-                def generate_random_settings():
-                    room_names = list(blank_save["room_items"].keys())
-                    item_names = list(ITEM_CATALOG.keys())
-
-            # Example random distribution of items
-                    shuffled_items = random.sample(item_names, min(10, len(item_names)))
-                    placed_items = {
-                        room: [] for room in room_names
-                    }
-                    for item in shuffled_items:
-                        room_choice = random.choice(room_names)
-                        placed_items[room_choice].append(item)
-
-                    return {
-                        "visited_coords": [],
-                        "completed_tasks": [],
-                        "played_puzzles": [],
-                        "dialogue_flags": {},
-                        "item_positions": placed_items
-                    }
-
-                new_settings = generate_random_settings()
-                with open("data/settings.json", "w") as f:
-                    json.dump(new_settings, f, indent=2)
-                print("Game settings (world state) have been reset.")
-
-        # --- Reinitialize player object in fresh state ---
-                player = load_game()
-                print("\nGame has been fully reset.\n")
-                player.update_room()
-
-        elif command.startswith("store "):
-            item_name = command.replace("store ", "").strip()
-            player.store_item_in_magic_box(item_name)
-
-        elif command.startswith("drop "):
-            item_name = command.replace("drop ", "").strip()
-            player.drop_item(item_name)
-
-        elif command == "solve puzzle":
-            puzzle, category, index = get_random_puzzle(puzzles)
-
-            if is_puzzle_solved(category, index):
-                print("You’ve already solved this puzzle.")
-            else:
-                print(f"Solve the puzzle: {puzzle['question']}")
-                player_input = input("Your answer: ").strip().lower()
-
-                if is_correct_answer(puzzle, player_input):
-                    print("Correct! You unlocked new content.")
-                    mark_puzzle_solved(category, index)
-
-                    puzzle_tag = f"{category}_{index}"
-                    unlock_related_content(puzzle_tag)
-
-                    if puzzle.get('unlock_log'):
-                        log = puzzle['unlock_log']
-                        print(f"Log Unlocked: {log['title']}")
-                        print(log['content'])
-
-                    if puzzle.get('unlock_dialogue'):
-                        print(f"New Dialogue: {puzzle['unlock_dialogue']}")
-                else:
-                    print("Incorrect. Try again.")
-
-        elif command == "save":
-            save_game(player)
-
-        elif command == "quit":
-            print("Saving and exiting game...")
-            save_game(player)
-            break
-
-        elif command.startswith("use "):
-            item_name = command.replace("use ", "").strip()
-            player.use_item(item_name)
-            from src.puzzles import check_puzzle_trigger
-            check_puzzle_trigger(player, "use_item", item_name)
-
-        elif command == "map":
-            display_map(player)
-
-        elif command == "help":
-            print("Available commands:")
-            print(" - look")
-            print(" - move [direction] [steps] (e.g., move bow 3)")
-            print(" - use [item name]")
-            print(" - store [item name]")
-            print(" - drop [item name]")
-            print(" - use door")
-            print(" - inventory")
-            print(" - status")
-            print(" - solve puzzle")
-            print(" - save")
-            print(" - quit")
-            print(" - reset")
-            print(" - map")
 
+@COMMANDS.command("store", "item_name:text", usage="store [item name]")
+def store_command(game, item_name):
+    def store_in(box_name):
+        item = game.player.store_item_in_magic_box(item_name, box_name)
+        if item:
+            game.record("store", item=item.name, box=box_name)
+    game.ask("Enter the magic box name: ", store_in)
+
+
+@COMMANDS.command("drop", "item_name:text", usage="drop [item name]")
+def drop_command(game, item_name):
+    item = game.player.drop_item(item_name)
+    if item:
+        game.record("drop", item=item.name, room=get_room(game.player.position)[0])
+
+
+@COMMANDS.command("use door")
+def use_door_command(game):
+    game.player.use_door()
+
+
+@COMMANDS.command("climb", usage="climb (use a ladder to another deck)", aliases=("use ladder",))
+def climb_command(game):
+    game.player.use_ladder()
+
+
+@COMMANDS.command("inventory", aliases=("i", "inv"))
+def inventory_command(game):
+    game.player.list_inventory()
+
+
+@COMMANDS.command("status")
+def status_command(game):
+    game.player.status()
+
+
+@COMMANDS.command("solve puzzle", aliases=("solve",))
+def solve_puzzle_command(game):
+    player = game.player
+    if player.pending_puzzle:
+        category, index = player.pending_puzzle
+        puzzle = load_puzzles()[category][index]
+        player.pending_puzzle = None
+    else:
+        puzzle, category, index = get_random_puzzle(load_puzzles(), rng=game.rng)
+
+    if is_puzzle_solved(category, index):
+        print("You’ve already solved this puzzle.")
+        return
+
+    def check_answer(answer):
+        if is_correct_answer(puzzle, answer.lower()):
+            print("Correct! You unlocked new content.")
+            mark_puzzle_solved(category, index)
+
+            puzzle_tag = f"{category}_{index}"
+            unlock_related_content(puzzle_tag)
+
+            if puzzle.get('unlock_log'):
+                log = puzzle['unlock_log']
+                print(f"Log Unlocked: {log['title']}")
+                print(log['content'])
+
+            if puzzle.get('unlock_dialogue'):
+                print(f"New Dialogue: {puzzle['unlock_dialogue']}")
         else:
-            print("Invalid command. Type 'help' for options.")
+            print("Incorrect. Try again.")
+
+    print(f"Solve the puzzle: {puzzle['question']}")
+    game.ask("Your answer: ", check_answer)
+
+
+@COMMANDS.command("save")
+def save_command(game):
+    game.save()
+
+
+@COMMANDS.command("slots", usage="slots (list saved games)")
+def slots_command(game):
+    list_save_slots()
+
+
+@COMMANDS.command("quit", aliases=("exit",))
+def quit_command(game):
+    print("Saving and exiting game...")
+    game.close()
+    return STOP
+
+
+@COMMANDS.command("reset")
+def reset_command(game):
+    def confirmed(answer):
+        if answer.lower() == "yes":
+            reset_game(game)
+    game.ask("Are you sure you want to reset the game? (yes/no): ", confirmed)
+
+
+def reset_game(game):
+    # --- Reset savegame.json ---
+    blank_save = {
+        "position": "I5",
+        "inventory": [],
+        "magic_storage": {},
+        "room_items": {
+            room: [] for room in [
+                "Bridge", "Server Room", "Weapons Room", "Engine Room", "Airlock", "Corridor",
+                "Cargo Bay (Start)", "Sleeping Quarters 1", "Sleeping Quarters 2",
+                "Sleeping Quarters 3", "Sleeping Quarters 4", "Chow Hall", "Med Bay",
+                "Secret Passage 1", "Secret Passage 2", "Secret Passage 3"
+            ]
+        }
+    }
+    current_storage().write("save", blank_save)
+    if game.journal:
+        game.journal.snapshot(blank_save)
+    print("Player savegame has been cleared.")
+
+    # --- Reset settings.json ---
+    def generate_random_settings():
+        room_names = list(blank_save["room_items"].keys())
+        item_names = list(ITEM_CATALOG.keys())
+
+        # Example random distribution of items
+        shuffled_items = game.rng.sample(item_names, min(10, len(item_names)))
+        placed_items = {
+            room: [] for room in room_names
+        }
+        for item in shuffled_items:
+            room_choice = game.rng.choice(room_names)
+            placed_items[room_choice].append(item)
+
+        return {
+            "visited_coords": [],
+            "completed_tasks": [],
+            "played_puzzles": [],
+            "dialogue_flags": {},
+            "item_positions": placed_items
+        }
+
+    new_settings = generate_random_settings()
+    current_storage().write("settings", new_settings)
+    print("Game settings (world state) have been reset.")
+
+    # --- Reinitialize player object in fresh state ---
+    game.player = load_game()
+    DECKS.visit(game.player.position)
+    game.load_world()
+    game.last_position = game.player.position
+    print("\nGame has been fully reset.\n")
+    game.player.update_room()
+
+
+@COMMANDS.command("map")
+def map_command(game):
+    display_map(game.player)
+
+
+@COMMANDS.command("content", usage="content (data files loaded and what they cost)")
+def content_command(game):
+    CONTENT.report()
+
+
+@COMMANDS.command("help", aliases=("?",))
+def help_command(game):
+    print("Available commands:")
+    for usage in COMMANDS.usages():
+        print(f" - {usage}")
+
+
+class ScriptInput:
+    """Stands in for input() in headless runs, reading lines from a script.
+
+    Blank lines and lines starting with # are skipped unless raw is set,
+    as it is for replays, where every recorded line counts. Prompts are not
+    shown; answers to questions such as the reset confirmation are simply
+    the next lines of the script. Raises EOFError at the end, like input().
+    """
+
+    def __init__(self, lines, raw=False):
+        self.lines = iter(lines)
+        self.raw = raw
+        self.count = 0
+
+    def __call__(self, prompt=""):
+        for line in self.lines:
+            line = line.strip()
+            if self.raw or (line and not line.startswith("#")):
+                self.count += 1
+                return line
+        raise EOFError
+
+
+def saved_state():
+    """The stored state a session starts from: the save, the world settings and puzzle state."""
+    return {
+        "save": read_save_data(),
+        "settings": current_storage().read("settings"),
+        "puzzle_state": current_storage().read("puzzle_state"),
+    }
+
+
+def restore_state(state):
+    for kind, data in state.items():
+        if data is not None:
+            current_storage().write(kind, data)
+
+
+def play(game, record=None, start_state=None):
+    """The game loop: describe the room, read a command, run it.
+
+    With record, the session's seed, start_state and every line read are
+    written to that replay file when the loop ends.
+    """
+    if record:
+        recorder = game.read_line = Recorder(game.read_line)
+    try:
+        while game.player.is_alive():
+            game.before_command()
+            if not game.describe_room():
+                break
+
+            try:
+                command = game.read_line("\nEnter command: ")
+                if not game.handle(command):
+                    break
+            except EOFError:
+                # Input ran out without quit; writes are lazy, so save like quit does.
+                print("\nEnd of input. Saving and exiting game...")
+                game.close()
+                break
+    finally:
+        if record:
+            save_replay(record, game.rng.seed_value, recorder.commands, start_state)
+
+
+def run_headless(feed, output=None, rng=None, record=None, start_state=None):
+    """Plays the lines feed returns without prompts and reports the command rate on stderr.
+
+    Game output goes to the output file if one is given and is discarded otherwise.
+    """
+    started = time.perf_counter()
+    with open(output or os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        play(Game(read_line=feed, rng=rng), record, start_state)
+    elapsed = time.perf_counter() - started
+    rate = feed.count / elapsed if elapsed > 0 else 0.0
+    print(f"Ran {feed.count} commands in {elapsed:.3f}s ({rate:.0f} commands/s).", file=sys.stderr)
+
+
+def run_script(script, output=None, rng=None, record=None, start_state=None):
+    """Plays a command script; script is a path or "-" for stdin."""
+    if script in (None, "-"):
+        run_headless(ScriptInput(sys.stdin), output, rng, record, start_state)
+        return
+    with open(script, "r") as stream:
+        run_headless(ScriptInput(stream), output, rng, record, start_state)
+
+
+def run_replay(path, output=None):
+    """Plays a replay file at full speed against scratch storage, leaving real saves alone.
+
+    The same replay always produces the same output, so --output files from
+    two versions of the game can be compared byte for byte.
+    """
+    seed, commands, state = load_replay(path)
+    with current_storage().scratch(), current_journal().scratch():
+        restore_state(state)
+        run_headless(ScriptInput(commands, raw=True), output, SessionRandom(seed))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Forgotten Ship")
+    parser.add_argument("--script", metavar="FILE",
+                        help="run commands from FILE ('-' for stdin) without prompts")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without prompts, reading commands from stdin unless --script is given")
+    parser.add_argument("--output", metavar="FILE",
+                        help="in headless runs, write game output to FILE instead of discarding it")
+    parser.add_argument("--seed", type=int,
+                        help="seed for the session's random choices (random if omitted)")
+    parser.add_argument("--record", metavar="FILE",
+                        help="write the seed, starting state and commands of this run to a replay FILE")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="play a replay FILE headless, without touching saved games")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.replay:
+        run_replay(args.replay, args.output)
+        return
+
+    rng = SessionRandom(args.seed)
+    start_state = saved_state() if args.record else None
+    if args.script or args.headless:
+        run_script(args.script, args.output, rng, args.record, start_state)
+        return
+
+    game = Game(rng=rng)
+
+    print("Welcome to Forgotten Ship.")
+    print(game.log_data.get('intro', "Intro text not found."))
+    print("Type 'help' for available commands.\n")
+
+    play(game, args.record, start_state)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,145 @@
+# navigation.py — Shortest routes across the ship for the goto command
+from collections import OrderedDict, deque
+
+from src.coords import Coord
+from src.ship import DIRECTIONS, DOOR_GRAPH, ROOM_INDEX, SHIP_MAP, step
+
+MAX_CACHED_FIELDS = 64
+
+
+def can_cross(from_coord, to_coord, keys):
+    """Checks whether a single grid step is legal with the given key names."""
+    to_room = ROOM_INDEX.room_name_at(to_coord)
+    if to_room is None:
+        return False
+    if ROOM_INDEX.room_name_at(from_coord) == to_room:
+        return True
+    door = DOOR_GRAPH.crossing(from_coord, to_coord)
+    if door is None:
+        return False
+    return not door.locked or door.key in keys
+
+
+def passage_links(keys):
+    """Revealed secret passages (and doors used with 'use door') the keys allow."""
+    links = []
+    for exits in DOOR_GRAPH.by_entry.values():
+        for link in exits:
+            if not link.revealed or link.exit is None:
+                continue
+            if link.locked and link.key not in keys:
+                continue
+            if ROOM_INDEX.room_name_at(link.exit) is None:
+                continue
+            links.append(link)
+    return links
+
+
+class Navigator:
+    """Caches BFS distance fields per target and key set.
+
+    A field maps every cell that can reach the target to its distance in
+    steps. Fields are also keyed by the session's door changes, and are
+    thrown away only when the room index is rebuilt or a door is locked,
+    unlocked or revealed outside a session.
+    """
+
+    def __init__(self):
+        self.fields = OrderedDict()
+        self.versions = None
+
+    def _check_versions(self):
+        versions = (ROOM_INDEX.version, DOOR_GRAPH.version)
+        if versions != self.versions:
+            self.fields.clear()
+            self.versions = versions
+
+    def distance_field(self, targets, keys):
+        self._check_versions()
+        cache_key = (targets, keys, DOOR_GRAPH.session_key())
+        field = self.fields.get(cache_key)
+        if field is not None:
+            self.fields.move_to_end(cache_key)
+            return field
+
+        # Walk the graph backwards from the targets.
+        jumps_into = {}
+        for link in passage_links(keys):
+            jumps_into.setdefault(link.exit, []).append(link.entry)
+
+        field = {cell: 0 for cell in targets}
+        queue = deque(targets)
+        while queue:
+            cell = queue.popleft()
+            dist = field[cell] + 1
+            for direction in DIRECTIONS:
+                prev = step(cell, direction)
+                if prev in field or ROOM_INDEX.room_name_at(prev) is None:
+                    continue
+                if can_cross(prev, cell, keys):
+                    field[prev] = dist
+                    queue.append(prev)
+            for prev in jumps_into.get(cell, ()):
+                if prev not in field:
+                    field[prev] = dist
+                    queue.append(prev)
+
+        self.fields[cache_key] = field
+        if len(self.fields) > MAX_CACHED_FIELDS:
+            self.fields.popitem(last=False)
+        return field
+
+    def route(self, start, targets, keys):
+        """Returns the cells to walk through from start to the nearest target.
+
+        The list excludes start and is empty when start is already a target.
+        Returns None when no legal route exists.
+        """
+        targets = tuple(sorted(targets))
+        keys = frozenset(keys)
+        field = self.distance_field(targets, keys)
+        if start not in field:
+            return None
+
+        jumps_from = {}
+        for link in passage_links(keys):
+            jumps_from.setdefault(link.entry, []).append(link.exit)
+
+        path = []
+        cell = start
+        while field[cell] > 0:
+            want = field[cell] - 1
+            for direction in DIRECTIONS:
+                nxt = step(cell, direction)
+                if field.get(nxt) == want and can_cross(cell, nxt, keys):
+                    break
+            else:
+                nxt = next(n for n in jumps_from.get(cell, ()) if field.get(n) == want)
+            path.append(nxt)
+            cell = nxt
+        return path
+
+
+NAVIGATOR = Navigator()
+
+
+def parse_target(target):
+    """Resolves a room name or a cell such as 'J10' to a tuple of target cells."""
+    target = target.strip()
+    for room_name, data in SHIP_MAP.items():
+        if room_name.lower() == target.lower() and data.get("coords"):
+            return tuple(data["coords"])
+
+    cell = Coord.parse(target)
+    if cell is not None and ROOM_INDEX.room_name_at(cell) is not None:
+        return (cell,)
+    return ()
+
+
+def route_to(player, target):
+    """Plans a route for the player to a room or cell; None if unreachable."""
+    targets = parse_target(target)
+    if not targets:
+        return None
+    keys = [item.name for item in player.inventory if item.category == "key"]
+    return NAVIGATOR.route(player.position, targets, keys)
@@ -0,0 +1,65 @@
+# overlay.py — Per-session changes layered over the shipped logs and dialogue
+from src.session import SESSION
+
+class ContentOverlay:
+    """Unlock state kept apart from the content files.
+
+    logs.json and dialogue.json are only ever read. Unlocking a log or
+    adding a dialogue line records a small delta here, and lookups merge
+    it with the loaded content. The delta travels with the save game.
+    """
+
+    def __init__(self):
+        self.unlocked_logs = set()
+        self.room_lines = {}    # room key -> lines added during play
+        self.listeners = []     # called with (event, value), e.g. ("log", "log_002")
+
+    def clear(self):
+        self.unlocked_logs.clear()
+        self.room_lines.clear()
+
+    def load(self, data):
+        """Restores the delta written by to_dict()."""
+        self.clear()
+        self.unlocked_logs.update(data.get("logs", []))
+        for room_key, lines in data.get("dialogue", {}).items():
+            self.room_lines[room_key] = list(lines)
+
+    def to_dict(self):
+        return {
+            "logs": sorted(self.unlocked_logs),
+            "dialogue": {room_key: list(lines) for room_key, lines in self.room_lines.items()},
+        }
+
+    def _notify(self, event, value):
+        for listener in self.listeners:
+            listener(event, value)
+
+    def unlock_log(self, log_id):
+        if log_id not in self.unlocked_logs:
+            self.unlocked_logs.add(log_id)
+            self._notify("log", log_id)
+
+    def add_room_line(self, room_key, line):
+        lines = self.room_lines.setdefault(room_key, [])
+        if line not in lines:
+            lines.append(line)
+            self._notify("line", (room_key, line))
+
+    def room_dialogue(self, room_key, lines):
+        """The shipped lines for a room followed by any added ones."""
+        extra = self.room_lines.get(room_key)
+        return list(lines) + extra if extra else lines
+
+
+CONTENT_OVERLAY = ContentOverlay()
+
+
+def current_content_overlay():
+    """The content overlay of the session running in this context, or CONTENT_OVERLAY outside one."""
+    session = SESSION.get()
+    if session is None:
+        return CONTENT_OVERLAY
+    if session.content is None:
+        session.content = ContentOverlay()
+    return session.content
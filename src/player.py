@@ -1,20 +1,29 @@
 import json
 import os
 import sys
-from src.inventory import ITEM_CATALOG, Item, apply_item_effect
-from src.ship import SHIP_MAP, get_room
+from src.coords import Coord
+from src.decks import DECKS
+from src.inventory import ITEM_CATALOG, Item, apply_item_effect, current_items
+from src.ship import DOOR_GRAPH, ROOM_INDEX, get_room, step
+from src.vision import visible_tiles
 
 
 class Player:
-    def __init__(self, name="Ryan", position=("I", 5), has_flashlight=False):
+    def __init__(self, name="Ryan", position="I5", has_flashlight=False):
         self.name = name
-        self.position = position
+        self.position = Coord.coerce(position)
         self.inventory = []
         self.health = 100
         self.max_inventory = 5
         self.has_flashlight = has_flashlight
         self.explored_coords = []  # Added to support map tracking
         self.doors_coords = []     # Added to support map tracking
+        self.magic_storage = {}
+        self.visited_coords = []
+        self.completed_tasks = []
+        self.dialogue_flags = {}
+        self.dialogue_cursors = {}  # candidate lines per room, kept by DIALOGUE_INDEX
+        self.pending_puzzle = None  # (category, index) set off by check_puzzle_trigger
 
     def is_alive(self):
         return self.health > 0
@@ -28,29 +37,25 @@ class Player:
             print(f"Invalid direction: {direction}")
             return
 
-        x, y = self.position
         moved = 0
+        remaining = steps
+
+        while remaining > 0:
+            # Straight run inside the current room: jump to its end in one go.
+            run = ROOM_INDEX.run_length(self.position, direction)
+            if run:
+                hop = min(run, remaining)
+                self.position = step(self.position, direction, hop)
+                moved += hop
+                remaining -= hop
+                continue
 
-        for _ in range(steps):
-            if direction == "bow":
-                y += 1
-            elif direction == "stern":
-                y -= 1
-            elif direction == "port":
-                x = chr(ord(x) - 1)
-            elif direction == "starboard":
-                x = chr(ord(x) + 1)
-
-            new_position = (x, y)
-
-            current_room_name = None
-            new_room_name = None
+            # Only the boundary crossing needs the room and door checks.
+            new_position = step(self.position, direction)
+            remaining -= 1
 
-            for room_name, room_data in SHIP_MAP.items():
-                if self.position in room_data.get("coords", []):
-                    current_room_name = room_name
-                if new_position in room_data.get("coords", []):
-                    new_room_name = room_name
+            current_room_name, _ = get_room(self.position)
+            new_room_name, _ = get_room(new_position)
 
             if new_room_name is None:
                 print(f"Movement stopped — there's no room at {new_position}.")
@@ -61,48 +66,50 @@ class Player:
                 moved += 1
                 continue
 
-            door_allowed = False
-            for room in (current_room_name, new_room_name):
-                if room and "doors" in SHIP_MAP[room]:
-                    for door_data in SHIP_MAP[room]["doors"].values():
-                        entry = door_data.get("entry")
-                        exit_ = door_data.get("exit")
-                        if ((self.position == entry and new_position == exit_) or
-                            (self.position == exit_ and new_position == entry)):
-                            if door_data.get("locked", False):
-                                key_needed = door_data.get("key")
-                                if not self.has_item(key_needed):
-                                    print(f"The door is locked. You need the {key_needed}.")
-                                    return
-                            door_allowed = True
-                            break
-                if door_allowed:
-                    break
-
-            if door_allowed:
-                self.position = new_position
-                moved += 1
-            else:
+            door = DOOR_GRAPH.crossing(self.position, new_position)
+            if door is None:
                 print("You can't go that way. There’s a wall or no accessible door.")
                 break
 
+            if door.locked and not self.has_item(door.key):
+                print(f"The door is locked. You need the {door.key}.")
+                return
+
+            self.position = new_position
+            moved += 1
+
         if moved > 0:
             print(f"[Current Position: {self.position}]")
         self.update_room()
 
+    def follow_route(self, route):
+        """Walks a route planned by src.navigation, one cell at a time."""
+        if not self.is_alive():
+            print(f"{self.name} cannot move because they are dead.")
+            return
+
+        if not route:
+            print("You are already there.")
+            return
+
+        for cell in route:
+            self.position = cell
+        print(f"You make your way there in {len(route)} steps.")
+        print(f"[Current Position: {self.position}]")
+        self.update_room()
+
     def get_current_room(self):
-        for room_name, room_data in SHIP_MAP.items():
-            if self.position in room_data["coords"]:
-                return room_data
-        return None
+        _, room_data = get_room(self.position)
+        return room_data
 
     def get_current_room_name(self):
-        current_room = self.get_current_room()
+        room_name, current_room = get_room(self.position)
         if current_room:
-            return current_room.get("name", "Unknown Room")
+            return current_room.get("name", room_name)
         return "Unknown Room"
 
     def update_room(self):
+        DECKS.visit(self.position)
         current_room = self.get_current_room()
         if current_room:
             print(f"\nYou are in: {self.get_current_room_name()}")
@@ -119,13 +126,7 @@ class Player:
 
         print("You look around the room.")
         visible_tiles = self.get_visible_tiles()
-        item_list = []
-
-        for coord in visible_tiles:
-            for room_data in SHIP_MAP.values():
-                if coord in room_data.get("coords", []):
-                    for item in room_data.get("compartment", []):
-                        item_list.append(f"{item.name} at {coord}")
+        item_list = [f"{item.name} at {coord}" for coord, item in current_items().items_on(visible_tiles)]
 
         print(f"\nYou are in: {self.get_current_room_name()}")
         print(f"Space {self.position}")
@@ -174,6 +175,21 @@ class Player:
         print(f"Item added: {item.name} — {item.description}")
         return True
 
+    def pickup_item(self, item_name):
+        if not self.is_alive():
+            print(f"{self.name} cannot pick up items because they are dead.")
+            return None
+
+        name, coord = current_items().find(item_name)
+        if name is None or not self.can_see(coord):
+            print(f"You don't see {item_name} nearby.")
+            return None
+
+        if self.add_item(name):
+            current_items().remove(name)
+            return ITEM_CATALOG[name]
+        return None
+
     def get_carry_count(self):
         count = 0
         for item in self.inventory:
@@ -190,17 +206,44 @@ class Player:
             return None
 
         for i, item in enumerate(self.inventory):
-            if item.name == item_name:
+            if item.name.lower() == item_name.lower():
                 removed = self.inventory.pop(i)
                 print(f"Dropped: {removed.name}")
-                current_room = self.get_current_room()
-                if "compartment" not in current_room:
-                    current_room["compartment"] = []
-                current_room["compartment"].append(item)
+                current_items().place(removed.name, self.position)
                 return removed
         print(f"{item_name} not in inventory.")
         return None
 
+    def store_item_in_magic_box(self, item_name, box_name):
+        if not self.is_alive():
+            print(f"{self.name} cannot store items because they are dead.")
+            return None
+
+        for item in self.inventory:
+            if item.name.lower() == item_name.lower():
+                self.inventory.remove(item)
+                self.magic_storage.setdefault(box_name, []).append(item)
+                print(f"You stored {item.name} in the magic box '{box_name}'.")
+                return item
+        print(f"Item '{item_name}' not found in your inventory.")
+        return None
+
+    def use_item(self, item_name):
+        """Applies an item's effect. Returns the game-state updates it made, or None."""
+        if not self.is_alive():
+            print(f"{self.name} cannot use items because they are dead.")
+            return None
+
+        for item in self.inventory:
+            if item.name.lower() == item_name.lower():
+                game_state = {task: True for task in self.completed_tasks}
+                consumed, updates = apply_item_effect(self, item, self.get_current_room_name(), game_state)
+                if consumed and item.category != "npc":
+                    self.inventory.remove(item)
+                return updates or {}
+        print(f"Item '{item_name}' not found in your inventory.")
+        return None
+
     def has_item(self, item_name):
         return any(item.name == item_name for item in self.inventory)
 
@@ -222,34 +265,55 @@ class Player:
             print(f"- {item.name} ({item.category})")
 
     def use_door(self):
-        current_room = self.get_current_room()
-        if not current_room or "doors" not in current_room:
+        if not self.get_current_room():
             print("There is no door here.")
             return
 
-        for door_label, door_data in current_room["doors"].items():
-            if self.position == door_data.get("entry"):
-                if door_data.get("locked"):
-                    key_needed = door_data.get("key")
-                    if not self.has_item(key_needed):
-                        print(f"The {door_label} is locked. You need the {key_needed}.")
-                        return
-                self.position = door_data["exit"]
-                print(f"You go through the {door_label}.")
+        for door in DOOR_GRAPH.exits_from(self.position):
+            if door.kind == "ladder":
+                continue
+            if door.locked and not self.has_item(door.key):
+                print(f"The {door.label} is locked. You need the {door.key}.")
                 return
+            self.position = door.exit
+            print(f"You go through the {door.label}.")
+            DECKS.visit(self.position)
+            return
 
         print("There is no usable door at your location.")
 
+    def use_ladder(self):
+        if not self.is_alive():
+            print(f"{self.name} cannot climb because they are dead.")
+            return
+
+        for ladder in DOOR_GRAPH.exits_from(self.position):
+            if ladder.kind != "ladder":
+                continue
+            if ladder.locked and not self.has_item(ladder.key):
+                print(f"The {ladder.label} is locked. You need the {ladder.key}.")
+                return
+            if not DECKS.ensure(ladder.exit.z):
+                print(f"The {ladder.label} is blocked.")
+                return
+            self.position = ladder.exit
+            print(f"You climb {ladder.label}.")
+            print(f"[Current Position: {self.position} — {DECKS.deck_name(self.position.z)}]")
+            self.update_room()
+            return
+
+        print("There is no ladder here.")
+
     def save(self, filename="savegame.json"):
         data = {
             "name": self.name,
-            "position": self.position,
+            "position": self.position.label,
             "inventory": [item.name for item in self.inventory],
             "health": self.health,
             "max_inventory": self.max_inventory,
             "has_flashlight": self.has_flashlight,
-            "explored_coords": self.explored_coords,
-            "doors_coords": self.doors_coords,
+            "explored_coords": [coord.label for coord in self.explored_coords],
+            "doors_coords": [coord.label for coord in self.doors_coords],
         }
 
         with open(filename, "w") as f:
@@ -267,13 +331,13 @@ class Player:
             data = json.load(f)
 
         player = cls(name=data.get("name", "Ryan"),
-                     position=tuple(data.get("position", ("I", 5))),
+                     position=data.get("position", "I5"),
                      has_flashlight=data.get("has_flashlight", False))
 
         player.health = data.get("health", 100)
         player.max_inventory = data.get("max_inventory", 5)
-        player.explored_coords = [tuple(coord) for coord in data.get("explored_coords", [])]
-        player.doors_coords = [tuple(coord) for coord in data.get("doors_coords", [])]
+        player.explored_coords = [Coord.coerce(coord) for coord in data.get("explored_coords", [])]
+        player.doors_coords = [Coord.coerce(coord) for coord in data.get("doors_coords", [])]
 
         inventory_names = data.get("inventory", [])
         for item_name in inventory_names:
@@ -308,32 +372,10 @@ class Player:
 
     # --- Vision and Map Awareness ---
     def get_visible_tiles(self):
-        visible = set()
-        x, y = self.position
-        room_name, room_data = get_room(self.position)
-        if not room_data:
-            return visible
-        room_coords = set(room_data["coords"])
-        visible.add((x, y))
-
-        if self.has_flashlight:
-            for dx in range(-1, 2):
-                for dy in range(-1, 2):
-                    nx = chr(ord(x) + dx)
-                    ny = y + dy
-                    if (nx, ny) in room_coords:
-                        visible.add((nx, ny))
-        else:
-            for dx, dy in [(0, 1), (0, -1), (-1, 0), (1, 0)]:
-                nx = chr(ord(x) + dx)
-                ny = y + dy
-                if (nx, ny) in room_coords:
-                    visible.add((nx, ny))
-
-        return visible
+        return set(visible_tiles(self.position, self.has_flashlight))
 
     def can_see(self, coord):
-        return coord in self.get_visible_tiles()
+        return coord in visible_tiles(self.position, self.has_flashlight)
 
     def show_map(self):
         current_room = self.get_current_room()
@@ -341,12 +383,13 @@ class Player:
             print("Cannot display map - you're not in a valid room.")
             return
 
-        ship_width = 10
-        ship_height = 10
+        # Size the map to the ship, as ui.generate_map does.
+        _, _, max_x, max_y = ROOM_INDEX.bounds
+        ship_width = max(max_x, self.position.x) + 1
+        ship_height = max(max_y, self.position.y)
         ship_map = [["." for _ in range(ship_width)] for _ in range(ship_height)]
-        x, y = self.position
-        x_idx = ord(x) - ord("A")
-        y_idx = y - 1
+        x_idx = self.position.x
+        y_idx = self.position.y - 1
 
         if 0 <= x_idx < ship_width and 0 <= y_idx < ship_height:
             ship_map[y_idx][x_idx] = "P"
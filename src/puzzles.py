@@ -1,91 +1,57 @@
 import json
-import random
 import difflib
-import os
+from src.conditions import ConditionError, ConditionState, compile_condition
+from src.content import CONTENT, CONTENT_FILES
+from src.storage import current_storage, PUZZLE_STATE_FILE
+from src.overlay import current_content_overlay
+from src.replay import RNG
+from src.session import SESSION
 
-PUZZLE_FILE = "data/puzzles.json"
-LOG_FILE = "data/logs.json"
-DIALOGUE_FILE = "data/dialogue.json"
-PUZZLE_STATE_FILE = "data/puzzle_state.json"
+PUZZLE_FILE = CONTENT_FILES["puzzles"]
 
 def load_puzzles():
-    """Loads puzzles from the file."""
-    if not os.path.exists(PUZZLE_FILE):
-        return {}
-    try:
-        with open(PUZZLE_FILE, "r") as file:
-            return json.load(file)
-    except json.JSONDecodeError:
-        print(f"Error decoding {PUZZLE_FILE}. Returning empty puzzles.")
-        return {}
+    """Returns the shared puzzle data."""
+    return CONTENT.get("puzzles")
 
 def load_logs():
-    """Loads logs from the file."""
-    if not os.path.exists(LOG_FILE):
-        return {}
-    try:
-        with open(LOG_FILE, "r") as file:
-            return json.load(file)
-    except json.JSONDecodeError:
-        print(f"Error decoding {LOG_FILE}. Returning empty logs.")
-        return {}
-
-def save_logs(logs):
-    """Saves logs to the file."""
-    try:
-        with open(LOG_FILE, "w") as file:
-            json.dump(logs, file, indent=4)
-    except IOError:
-        print(f"Error writing to {LOG_FILE}.")
+    """Returns the shared log data."""
+    return CONTENT.get("logs")
 
 def load_dialogue():
-    """Loads dialogue from the file."""
-    if not os.path.exists(DIALOGUE_FILE):
-        return {}
-    try:
-        with open(DIALOGUE_FILE, "r") as file:
-            return json.load(file)
-    except json.JSONDecodeError:
-        print(f"Error decoding {DIALOGUE_FILE}. Returning empty dialogue.")
-        return {}
-
-def save_dialogue(dialogue):
-    """Saves dialogue to the file."""
-    try:
-        with open(DIALOGUE_FILE, "w") as file:
-            json.dump(dialogue, file, indent=4)
-    except IOError:
-        print(f"Error writing to {DIALOGUE_FILE}.")
+    """Returns the shared dialogue data."""
+    return CONTENT.get("dialogue")
 
 def load_puzzle_state():
     """Loads puzzle state tracking."""
-    if os.path.exists(PUZZLE_STATE_FILE):
-        try:
-            with open(PUZZLE_STATE_FILE, "r") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            print(f"Error decoding {PUZZLE_STATE_FILE}. Returning empty puzzle state.")
+    try:
+        return current_storage().read("puzzle_state") or {}
+    except json.JSONDecodeError:
+        print(f"Error decoding {PUZZLE_STATE_FILE}. Returning empty puzzle state.")
     return {}
 
 def save_puzzle_state(state):
     """Saves puzzle state tracking."""
     try:
-        with open(PUZZLE_STATE_FILE, "w") as f:
-            json.dump(state, f, indent=4)
+        current_storage().write("puzzle_state", state)
     except IOError:
         print(f"Error writing to {PUZZLE_STATE_FILE}.")
 
-def get_random_puzzle(puzzles, category=None):
+def get_random_puzzle(puzzles, category=None, rng=RNG):
     """Returns a random puzzle, optionally from a specific category."""
     if category:
-        index = random.randint(0, len(puzzles[category]) - 1)
+        index = rng.randint(0, len(puzzles[category]) - 1)
+        return puzzles[category][index], category, index
+    puzzle_list = CONTENT.index("puzzle_list") if puzzles is CONTENT.get("puzzles") else None
+    if puzzle_list is not None:
+        # Prebuilt by the bundle in the same order as the loop below.
+        category, index = rng.choice(puzzle_list)
         return puzzles[category][index], category, index
     else:
         all = []
         for cat in puzzles:
             for i, p in enumerate(puzzles[cat]):
                 all.append((p, cat, i))
-        return random.choice(all)
+        return rng.choice(all)
 
 def is_correct_answer(puzzle, player_input):
     """Checks if the player's answer is correct."""
@@ -105,35 +71,144 @@ def is_correct_answer(puzzle, player_input):
         print(f"Unknown puzzle type: {puzzle['type']}")
         return False
 
+class PuzzleProgress:
+    """Solved puzzles for the session, read from storage once.
+
+    Checks are answered from an in-memory set. Newly solved puzzles are
+    only written back by flush(), which the game calls together with the
+    other saves so they share one storage transaction.
+    """
+
+    def __init__(self):
+        self.state = None
+        self.solved = set()
+        self.dirty = False
+
+    def load(self):
+        self.state = load_puzzle_state()
+        self.solved = {key for key, done in self.state.items() if done}
+        self.dirty = False
+
+    def _ensure_loaded(self):
+        if self.state is None:
+            self.load()
+
+    def is_solved(self, puzzle_key):
+        self._ensure_loaded()
+        return puzzle_key in self.solved
+
+    def mark_solved(self, puzzle_key):
+        """Returns False if the puzzle was already solved."""
+        self._ensure_loaded()
+        if puzzle_key in self.solved:
+            return False
+        self.solved.add(puzzle_key)
+        self.state[puzzle_key] = True
+        self.dirty = True
+        return True
+
+    def flush(self):
+        if self.dirty:
+            save_puzzle_state(self.state)
+            self.dirty = False
+
+
+PUZZLE_PROGRESS = PuzzleProgress()
+
+def current_puzzle_progress():
+    """The puzzle progress of the session running in this context, or PUZZLE_PROGRESS outside one."""
+    session = SESSION.get()
+    if session is None:
+        return PUZZLE_PROGRESS
+    if session.puzzles is None:
+        session.puzzles = PuzzleProgress()
+    return session.puzzles
+
 def mark_puzzle_solved(category, index):
-    """Marks a puzzle as solved and updates the puzzle state."""
-    state = load_puzzle_state()
+    """Marks a puzzle as solved; it is written out on the next save."""
     puzzle_key = f"{category}_{index}"
-    if puzzle_key in state:
+    if not current_puzzle_progress().mark_solved(puzzle_key):
         print(f"Puzzle {puzzle_key} already solved.")
         return False
-    state[puzzle_key] = True
-    save_puzzle_state(state)
     print(f"Marked puzzle {puzzle_key} as solved.")
     return True
 
 def is_puzzle_solved(category, index):
     """Checks if a puzzle has already been solved."""
-    state = load_puzzle_state()
-    return state.get(f"{category}_{index}", False)
+    return current_puzzle_progress().is_solved(f"{category}_{index}")
 
-def unlock_related_content(puzzle_tag):
-    """Unlocks content based on the puzzle tag."""
-    logs = load_logs()
-    dialogue = load_dialogue()
+def unlock_related_content(puzzle_tag, overlay=None):
+    """Unlocks content based on the puzzle tag.
 
+    Only the session overlay changes; the content files are left alone.
+    """
+    if overlay is None:
+        overlay = current_content_overlay()
     if puzzle_tag == "logic_0":
-        logs["log_002"]["unlocked"] = True
+        overlay.unlock_log("log_002")
         print("Unlocked log_002: Power Restored")
 
-        new_line = "Rachel: Power is flowing again. Systems are responding."
-        if "rooms" in dialogue and "engine_room" in dialogue["rooms"]:
-            dialogue["rooms"]["engine_room"]["dialogue"].append(new_line)
-
-        save_logs(logs)
-        save_dialogue(dialogue)
+        overlay.add_room_line("engine_room", "Rachel: Power is flowing again. Systems are responding.")
+
+class PuzzleTriggers:
+    """Puzzles that present themselves on a game event, compiled per puzzles.json version.
+
+    A puzzle opts in with a trigger such as
+        "trigger": {"on": "move", "target": "Engine Room", "when": "has Flashlight"}
+    where on is "move" (target is a room) or "use_item" (target is an item),
+    and the optional when is a condition from src.conditions.
+    """
+
+    def __init__(self):
+        self.by_event = {}  # event -> [(target, category, index, check)]
+        self.version = None
+
+    def _fresh(self):
+        version = CONTENT.version("puzzles")
+        if version == self.version:
+            return
+        self.by_event = {}
+        for category, puzzles in load_puzzles().items():
+            for index, puzzle in enumerate(puzzles):
+                trigger = puzzle.get("trigger")
+                if not trigger:
+                    continue
+                try:
+                    check = compile_condition(trigger["when"]) if trigger.get("when") else None
+                except ConditionError as e:
+                    print(f"Puzzle {category}_{index}: {e}. Its trigger is ignored.")
+                    continue
+                target = trigger.get("target")
+                self.by_event.setdefault(trigger.get("on"), []).append(
+                    (target.lower() if target else None, category, index, check)
+                )
+        self.version = version
+
+    def match(self, event, subject, state):
+        """(category, index) of the first unsolved puzzle triggered by the event, or None."""
+        self._fresh()
+        subject = (subject or "").lower()
+        for target, category, index, check in self.by_event.get(event, ()):
+            if target is not None and target != subject:
+                continue
+            if current_puzzle_progress().is_solved(f"{category}_{index}"):
+                continue
+            if check is None or check(state):
+                return category, index
+        return None
+
+
+PUZZLE_TRIGGERS = PuzzleTriggers()
+
+def check_puzzle_trigger(player, event, subject, state=None):
+    """Queues a puzzle for 'solve puzzle' when the event sets one off. Returns True if it did."""
+    if state is None:
+        state = ConditionState(tasks=player.completed_tasks, flags=player.dialogue_flags,
+                               items={item.name.lower() for item in player.inventory},
+                               solved=current_puzzle_progress().solved)
+    found = PUZZLE_TRIGGERS.match(event, subject, state)
+    if found is None or found == player.pending_puzzle:
+        return False
+    player.pending_puzzle = found
+    print("Something here demands your attention. Type 'solve puzzle'.")
+    return True
@@ -0,0 +1,54 @@
+# replay.py — Seeded random streams per session, and replay files of (seed, state, commands)
+import json
+import random
+import secrets
+
+REPLAY_VERSION = 1
+
+
+class SessionRandom(random.Random):
+    """A random.Random that remembers the seed it was started from.
+
+    Each play session draws every random choice from its own stream, so
+    the seed and the commands typed are enough to play a run again.
+    """
+
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = secrets.randbits(32)
+        self.seed_value = seed
+        super().__init__(seed)
+
+
+# For callers outside a session; sessions pass their own stream.
+RNG = SessionRandom()
+
+
+class Recorder:
+    """Wraps a read_line function and keeps every line it returns."""
+
+    def __init__(self, read_line):
+        self.read_line = read_line
+        self.commands = []
+
+    def __call__(self, prompt=""):
+        line = self.read_line(prompt)
+        self.commands.append(line.strip())
+        return line
+
+
+def save_replay(path, seed, commands, state=None):
+    """Writes a replay: the seed, the stored state the run started from and the lines typed."""
+    with open(path, "w") as f:
+        json.dump({"version": REPLAY_VERSION, "seed": seed, "state": state or {}, "commands": commands},
+                  f, separators=(",", ":"))
+        f.write("\n")
+
+
+def load_replay(path):
+    """Returns (seed, commands, state) from a replay file."""
+    with open(path, "r") as f:
+        data = json.load(f)
+    if data.get("version") != REPLAY_VERSION:
+        raise ValueError(f"{path} is a version {data.get('version')} replay; expected {REPLAY_VERSION}")
+    return data["seed"], data["commands"], data.get("state", {})
@@ -0,0 +1,220 @@
+# server.py — Asyncio line-protocol server: one game session per TCP connection
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import re
+import secrets
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from src.journal import JOURNAL_FILE, Journal
+from src.main import SAVE_MODE, Game
+from src.replay import SessionRandom
+from src.session import SESSION, SessionState
+from src.storage import PROFILES_DIR, STORAGE
+
+HOST = os.environ.get("FORGOTTEN_SHIP_HOST", "127.0.0.1")
+PORT = int(os.environ.get("FORGOTTEN_SHIP_PORT", "4000"))
+
+# Longest command line accepted; a longer one ends the session.
+MAX_LINE_BYTES = 4096
+
+# Stop reading a client's commands while this much of its output is unsent.
+WRITE_HIGH_WATER = 64 * 1024
+
+# Connections the OS may queue before they are accepted, for bursts of players joining.
+BACKLOG = 1024
+
+PROMPT = "\nEnter command: "
+
+PROFILE_PROMPT = "Profile to play as (blank for a guest game that is not kept): "
+PROFILE_NAME = re.compile(r"[A-Za-z0-9_-]{1,32}")
+GUEST_PREFIX = "guest-"
+
+# Game steps run here, one at a time, so their disk writes never block the
+# event loop and the shared ship is only ever touched by one thread.
+GAME_THREAD = ThreadPoolExecutor(max_workers=1, thread_name_prefix="game")
+
+
+class Session:
+    """One player's game, fed a line at a time.
+
+    Handlers print as they always have; run() points stdout at a buffer
+    while one runs, which is safe because steps only ever run one at a
+    time on GAME_THREAD. It also makes the session's SessionState current,
+    so item and door changes land in this session's copy of the rooms it
+    touched, and saves, world settings, puzzle progress and unlocked
+    content are its own. Without a profile the session
+    is a guest: it plays on scratch storage that close() deletes. The game
+    has no read_line, so a question such as the reset confirmation is
+    answered by the next line instead of input().
+    """
+
+    def __init__(self, seed=None, profile=None):
+        self.rng = SessionRandom(seed)
+        self.guest = profile is None
+        self.profile = profile or f"{GUEST_PREFIX}{secrets.token_hex(4)}"
+        storage = STORAGE.for_profile(self.profile)
+        journal = None
+        if SAVE_MODE == "journal":
+            journal = Journal(os.path.join(PROFILES_DIR, self.profile, os.path.basename(JOURNAL_FILE)))
+        self.state = SessionState(storage, journal)
+        self.cleanup = contextlib.ExitStack()
+        if self.guest:
+            self.cleanup.callback(storage.delete_profile)
+            self.cleanup.enter_context(storage.scratch())
+            if journal:
+                self.cleanup.enter_context(journal.scratch())
+        elif journal:
+            os.makedirs(os.path.dirname(journal.path), exist_ok=True)
+        self.game = None
+        self.commands = 0
+
+    def run(self, step, *args):
+        """Calls step with stdout captured. Returns (result, output)."""
+        buffer = io.StringIO()
+        token = SESSION.set(self.state)
+        try:
+            with contextlib.redirect_stdout(buffer):
+                result = step(*args)
+        finally:
+            SESSION.reset(token)
+        return result, buffer.getvalue()
+
+    def start(self):
+        self.game = Game(read_line=None, rng=self.rng)
+        print("Welcome to Forgotten Ship.")
+        print(self.game.log_data.get('intro', "Intro text not found."))
+        print("Type 'help' for available commands.\n")
+        return self.next_turn()
+
+    def next_turn(self):
+        """Per-turn upkeep and the room, then the prompt. False once the game is over."""
+        game = self.game
+        if not game.player.is_alive():
+            return False
+        game.before_command()
+        if not game.describe_room():
+            return False
+        print(PROMPT, end="")
+        return True
+
+    def feed(self, line):
+        """Runs one line from the player. False once the session should end."""
+        self.commands += 1
+        if not self.game.handle(line):
+            return False
+        if self.game.waiting():
+            return True
+        return self.next_turn()
+
+    def close(self):
+        """Saves and closes the journal, as the end of input does for a local game.
+
+        A guest's scratch storage is deleted afterwards.
+        """
+        try:
+            if self.game is not None:
+                self.game.close()
+        finally:
+            self.cleanup.close()
+
+
+async def in_game_thread(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(GAME_THREAD, func, *args)
+
+
+async def read_profile(reader, writer, sessions):
+    """Asks until the client names a profile nobody is playing, or none.
+
+    Returns the name, "" for a guest, or None if the client went away.
+    """
+    while True:
+        writer.write(PROFILE_PROMPT.encode())
+        await writer.drain()
+        line = await reader.readline()
+        if not line:
+            return None
+        name = line.decode("utf-8", errors="replace").strip()
+        if not name:
+            return ""
+        if not PROFILE_NAME.fullmatch(name) or name.startswith(GUEST_PREFIX):
+            writer.write(f"Profile names are 1-32 letters, digits, - or _, not starting with {GUEST_PREFIX}.\n".encode())
+        elif name in sessions:
+            writer.write(f"Profile {name} is already playing.\n".encode())
+        else:
+            return name
+
+
+async def handle_connection(reader, writer, sessions):
+    # drain() waits while more than WRITE_HIGH_WATER bytes are queued, and no
+    # command is read until it returns, so a slow client only stalls itself.
+    writer.transport.set_write_buffer_limits(high=WRITE_HIGH_WATER)
+    profile = session = None
+    try:
+        try:
+            profile = await read_profile(reader, writer, sessions)
+        except ValueError:
+            profile = None
+        if profile is None:
+            return
+        if profile:
+            sessions[profile] = None    # claimed while the session is set up
+        session = await in_game_thread(Session, None, profile or None)
+        sessions[session.profile] = session
+        alive, output = await in_game_thread(session.run, session.start)
+        while True:
+            writer.write(output.encode())
+            await writer.drain()
+            if not alive:
+                break
+            try:
+                line = await reader.readline()
+            except ValueError:
+                writer.write(f"\nLines are limited to {MAX_LINE_BYTES} bytes. Goodbye.\n".encode())
+                break
+            if not line:
+                break
+            alive, output = await in_game_thread(session.run, session.feed, line.decode("utf-8", errors="replace"))
+    except ConnectionError:
+        pass
+    except Exception:
+        traceback.print_exc()
+    finally:
+        if session is not None:
+            try:
+                await in_game_thread(session.run, session.close)
+            except Exception:
+                traceback.print_exc()
+        if session is not None:
+            sessions.pop(session.profile, None)
+        elif profile:
+            sessions.pop(profile, None)
+        writer.close()
+        with contextlib.suppress(ConnectionError):
+            await writer.wait_closed()
+
+
+async def serve(host=HOST, port=PORT):
+    sessions = {}   # profile -> Session
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(reader, writer, sessions),
+        host, port, limit=MAX_LINE_BYTES, backlog=BACKLOG,
+    )
+    addresses = ", ".join(f"{name[0]}:{name[1]}" for name in (s.getsockname() for s in server.sockets))
+    print(f"Forgotten Ship is listening on {addresses}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve Forgotten Ship over TCP, one game per connection")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
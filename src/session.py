@@ -0,0 +1,29 @@
+# session.py — What one player's session keeps apart from every other session
+from contextvars import ContextVar
+
+
+class SessionState:
+    """Everything a session keeps to itself, in one place.
+
+    Each field belongs to the module named beside it, and that module's
+    current_*() accessor is the only way to reach it. The rule is the same
+    for all of them: inside a session the accessor returns the session's
+    field, making it on first use; outside one it returns the module's
+    shared default (SHIP_MAP itself, ITEM_INDEX, STORAGE, ...). Storage and
+    journal depend on the profile, so the server passes them in.
+    """
+
+    def __init__(self, storage=None, journal=None):
+        self.ship = None        # src.ship ShipOverlay: copies of the rooms and links changed
+        self.items = None       # src.inventory ItemIndex
+        self.puzzles = None     # src.puzzles PuzzleProgress
+        self.content = None     # src.overlay ContentOverlay
+        self.storage = storage  # src.storage backend for the session's profile
+        self.journal = journal  # src.journal Journal, in journal save mode
+        self.deck_doors = {}    # src.decks: (room, label) -> saved flags waiting for their deck
+        self.deck_loads = {}    # src.decks: deck -> load of it this session has caught up with
+
+
+# The session running in this context; None outside one. Each asyncio task
+# has its own context, and the server sets this around every step it runs.
+SESSION = ContextVar("session", default=None)
@@ -1,15 +1,12 @@
 # Manages ship structure
-import json
+import os
+from src.content import CONTENT
+from src.coords import DIRECTIONS, Coord, step
+from src.session import SESSION
 
-# Load dialogue.json file (external)
 def load_dialogue():
-    """Loads the dialogue data from the dialogue.json file."""
-    try:
-        with open('data/dialogue.json', 'r') as file:
-            return json.load(file)
-    except FileNotFoundError:
-        print("Dialogue file not found.")
-        return {}
+    """Returns the shared dialogue data."""
+    return CONTENT.get("dialogue")
 
 def get_room_dialogue(room_name, dialogue_data):
     """Fetches the dialogue and description for the given room."""
@@ -147,6 +144,9 @@ SHIP_MAP = {
         "doors": {
             "to Airlock": {"entry": ("J", 5), "exit": ("J", 4), "locked": False},
             "to Corridor": {"entry": ("J", 9), "exit": ("J", 10), "locked": False}
+        },
+        "ladders": {
+            "down to the maintenance deck": {"entry": ("N", 6), "exit": ("N", 6, 1), "locked": False}
         }
     },
 
@@ -253,9 +253,435 @@ SHIP_MAP = {
     }
 }
 
+# --- Spatial index ---
+LINK_GROUPS = {
+    "doors": "door",
+    "secret_passages": "passage",
+    "ladders": "ladder",
+}
+
+
+def normalize_room(room_data, z=0):
+    """Converts a room's authored coordinates (e.g. ("J", 10)) to Coord in place.
+
+    z is the deck for coordinates that do not name one.
+    """
+    if "coords" in room_data:
+        room_data["coords"] = [Coord.coerce(c, z) for c in room_data["coords"]]
+    for group in LINK_GROUPS:
+        for link in room_data.get(group, {}).values():
+            for end in ("entry", "exit"):
+                if link.get(end) is not None:
+                    link[end] = Coord.coerce(link[end], z)
+    return room_data
+
+
+for _room_data in SHIP_MAP.values():
+    normalize_room(_room_data)
+
+
+# --- Per-session overlay ---
+class ShipOverlay:
+    """One session's changes to the shared ship.
+
+    SHIP_MAP stays the read-only definition every session shares. The
+    first time a session changes a room (its compartment, or a door or
+    passage in it), that room alone is copied here: a shallow copy with
+    its own compartment list, plus a copy of each link the session
+    actually locks, unlocks or reveals. Coords, descriptions and the other
+    links stay shared. Reads fall back to SHIP_MAP for every room not copied.
+    """
+
+    def __init__(self):
+        self.rooms = {}       # room name -> this session's copy
+        self.own_links = set()  # (room, group, label) of links copied here
+        self.doors = {}       # (room, label) -> (locked, revealed) as last set here
+        self.door_key = ()    # hashable form of doors, for per-session caches
+
+    def room(self, name):
+        if name not in SHIP_MAP:
+            return None
+        return self.rooms.get(name) or SHIP_MAP[name]
+
+    def writable(self, name):
+        copy = self.rooms.get(name)
+        if copy is None:
+            copy = self.rooms[name] = copy_room(SHIP_MAP[name])
+        return copy
+
+    def writable_link(self, room, group, label):
+        copy = self.writable(room)
+        if (room, group, label) not in self.own_links:
+            copy[group] = dict(copy[group])
+            copy[group][label] = dict(copy[group][label])
+            self.own_links.add((room, group, label))
+        return copy[group][label]
+
+    def door_changed(self, room, label, data):
+        self.doors[(room, label)] = (data.get("locked", False), data.get("revealed", False))
+        self.door_key = tuple(sorted(self.doors.items()))
+
+
+def copy_room(room_data):
+    """A shallow copy of a room with its own compartment list; links are copied when written."""
+    copy = dict(room_data)
+    if "compartment" in copy:
+        copy["compartment"] = list(copy["compartment"])
+    return copy
+
+
+def current_overlay():
+    """The ShipOverlay of the session running in this context; None means play on SHIP_MAP itself."""
+    session = SESSION.get()
+    if session is None:
+        return None
+    if session.ship is None:
+        session.ship = ShipOverlay()
+    return session.ship
+
+
+def room_data(room_name):
+    """The room as the current session sees it, or None."""
+    overlay = current_overlay()
+    if overlay is not None:
+        return overlay.room(room_name)
+    return SHIP_MAP.get(room_name)
+
+
+def writable_room(room_name):
+    """The room's data for changing: the session's own copy, or SHIP_MAP's without a session."""
+    overlay = current_overlay()
+    if overlay is not None:
+        return overlay.writable(room_name)
+    return SHIP_MAP[room_name]
+
+
+def iter_rooms():
+    """(room name, data) for every room, as the current session sees them."""
+    for room_name in SHIP_MAP:
+        yield room_name, room_data(room_name)
+
+
+class RoomIndex:
+    """Maps every coordinate to the room that owns it so lookups are O(1)."""
+
+    def __init__(self, ship_map, prebuilt=None):
+        self.ship_map = ship_map
+        self.cells = {}
+        self.runs = {}
+        self.door_cells = set()
+        self.passage_cells = set()
+        self.bounds = (0, 0, 0, 0)  # min_x, min_y, max_x, max_y
+        self.room_count = -1
+        self.version = 0
+        if prebuilt is not None and prebuilt["room_count"] == len(ship_map):
+            self._restore(prebuilt)
+        else:
+            self.rebuild()
+
+    def snapshot(self):
+        """Everything rebuild() computes, for storing in the content bundle."""
+        return {
+            "cells": self.cells,
+            "runs": self.runs,
+            "door_cells": self.door_cells,
+            "passage_cells": self.passage_cells,
+            "bounds": self.bounds,
+            "room_count": self.room_count,
+        }
+
+    def _restore(self, prebuilt):
+        self.cells = prebuilt["cells"]
+        self.runs = prebuilt["runs"]
+        self.door_cells = prebuilt["door_cells"]
+        self.passage_cells = prebuilt["passage_cells"]
+        self.bounds = prebuilt["bounds"]
+        self.room_count = prebuilt["room_count"]
+        self.version += 1
+
+    def rebuild(self):
+        """Re-scan the ship map. The first room listing a cell owns it, as before."""
+        cells = {}
+        self.door_cells = set()
+        self.passage_cells = set()
+        for room, data in self.ship_map.items():
+            for coord in data.get("coords", []):
+                cells.setdefault(coord, room)
+            for door in data.get("doors", {}).values():
+                self.door_cells.update((door.get("entry"), door.get("exit")))
+            for passage in data.get("secret_passages", {}).values():
+                self.passage_cells.update((passage.get("entry"), passage.get("exit")))
+        self.door_cells.discard(None)
+        self.passage_cells.discard(None)
+        self.cells = cells
+        if cells:
+            xs = [c.x for c in cells]
+            ys = [c.y for c in cells]
+            self.bounds = (min(xs), min(ys), max(xs), max(ys))
+        else:
+            self.bounds = (0, 0, 0, 0)
+        self.runs = {direction: self._build_runs(direction) for direction in DIRECTIONS}
+        self.room_count = len(self.ship_map)
+        self.version += 1
+
+    def _build_runs(self, direction):
+        """For each cell, how many more cells of the same room follow in a direction."""
+        cells = self.cells
+        runs = {}
+        for start in cells:
+            if start in runs:
+                continue
+            chain = [start]
+            nxt = step(start, direction)
+            while nxt not in runs and cells.get(nxt) == cells[start]:
+                chain.append(nxt)
+                nxt = step(nxt, direction)
+            run = runs[nxt] + 1 if nxt in runs and cells[nxt] == cells[start] else 0
+            for cell in reversed(chain):
+                runs[cell] = run
+                run += 1
+        return runs
+
+    def run_length(self, position, direction):
+        """Number of straight steps from position that stay inside its room."""
+        if len(self.ship_map) != self.room_count:
+            self.rebuild()
+        return self.runs[direction].get(position, 0)
+
+    def in_bounds(self, position):
+        min_x, min_y, max_x, max_y = self.bounds
+        return min_x <= position.x <= max_x and min_y <= position.y <= max_y
+
+    def is_door(self, position):
+        return position in self.door_cells
+
+    def is_passage(self, position):
+        return position in self.passage_cells
+
+    def is_wall(self, position):
+        """True for cells inside the ship's bounds that belong to no room."""
+        return self.in_bounds(position) and self.room_name_at(position) is None
+
+    def cells_of(self, room_name):
+        return [coord for coord, room in self.cells.items() if room == room_name]
+
+    def room_name_at(self, position):
+        # Rooms added or removed straight through SHIP_MAP are picked up here;
+        # edits to an existing room's coords need invalidate_room_index().
+        if len(self.ship_map) != self.room_count:
+            self.rebuild()
+        return self.cells.get(position)
+
+    def lookup(self, position):
+        room = self.room_name_at(position)
+        if room is None:
+            return None, None
+        return room, room_data(room)
+
+
+# Set FORGOTTEN_SHIP_COMPACT_GRID=1 to back lookups with the array grid
+# from src.grid instead of dicts; it uses far less memory on huge ships.
+COMPACT_GRID = os.environ.get("FORGOTTEN_SHIP_COMPACT_GRID") == "1"
+
+
+def build_room_index(ship_map, compact=COMPACT_GRID, prebuilt=None):
+    if compact:
+        from src.grid import ShipGrid
+        return ShipGrid(ship_map)
+    return RoomIndex(ship_map, prebuilt)
+
+
+# The content bundle, when present and current, carries this index prebuilt.
+ROOM_INDEX = build_room_index(SHIP_MAP, prebuilt=CONTENT.index("rooms"))
+
+
+def invalidate_room_index():
+    """Rebuild the coordinate index and door graph after rooms were edited in place."""
+    ROOM_INDEX.rebuild()
+    DOOR_GRAPH.rebuild()
+
+
+def add_room(room_name, room_data):
+    """Adds or replaces a room in SHIP_MAP and refreshes the indexes."""
+    add_rooms({room_name: room_data})
+
+
+def add_rooms(rooms, z=0):
+    """Adds or replaces several rooms at once, rebuilding the indexes a single time."""
+    for room_name, room_data in rooms.items():
+        SHIP_MAP[room_name] = normalize_room(room_data, z)
+    ROOM_INDEX.rebuild()
+    DOOR_GRAPH.rebuild()
+
+
+def remove_rooms(room_names):
+    """Drops rooms from SHIP_MAP and rebuilds the indexes. Returns the removed rooms."""
+    removed = {name: SHIP_MAP.pop(name) for name in room_names if name in SHIP_MAP}
+    ROOM_INDEX.rebuild()
+    DOOR_GRAPH.rebuild()
+    return removed
+
+
+# --- Door graph ---
+class DoorLink:
+    """A door or secret passage. Its state is the link dict in the current
+    session's view of the room, so it follows SHIP_MAP or the session's copy."""
+
+    def __init__(self, room, label, data, kind, group):
+        self.room = room
+        self.label = label
+        self.shared = data    # the link dict in SHIP_MAP
+        self.kind = kind      # "door", "passage" or "ladder"
+        self.group = group    # key of the link's dict in the room, e.g. "doors"
+
+    @property
+    def data(self):
+        overlay = current_overlay()
+        if overlay is not None:
+            copy = overlay.rooms.get(self.room)
+            if copy is not None:
+                return copy[self.group][self.label]
+        return self.shared
+
+    @property
+    def entry(self):
+        return self.data.get("entry")
+
+    @property
+    def exit(self):
+        return self.data.get("exit")
+
+    @property
+    def locked(self):
+        return self.data.get("locked", False)
+
+    @property
+    def key(self):
+        return self.data.get("key")
+
+    @property
+    def revealed(self):
+        return self.kind != "passage" or self.data.get("revealed", False)
+
+    def __repr__(self):
+        return f"{self.room}: {self.label} ({self.kind})"
+
+
+class DoorGraph:
+    """Compiled doors and secret passages, keyed by the crossing they allow.
+
+    The graph's shape is shared by all sessions; lock and reveal state is
+    read through each link, so one session's changes stay its own.
+    """
+
+    def __init__(self, ship_map):
+        self.ship_map = ship_map
+        self.links = {}       # (room, label) -> DoorLink
+        self.crossings = {}   # (from_coord, to_coord) -> DoorLink
+        self.by_entry = {}    # entry coord -> [DoorLink]
+        self.version = 0      # bumped on rebuilds and on lock/reveal changes outside a session
+        self.listeners = []   # called with (event, link) on lock/unlock/reveal
+        self.rebuild()
+
+    def rebuild(self):
+        self.links = {}
+        self.crossings = {}
+        self.by_entry = {}
+        for room, data in self.ship_map.items():
+            for group, kind in LINK_GROUPS.items():
+                for label, link in data.get(group, {}).items():
+                    self._add(DoorLink(room, label, link, kind, group))
+        self.version += 1
+
+    def _add(self, link):
+        self.links[(link.room, link.label)] = link
+        self.by_entry.setdefault(link.entry, []).append(link)
+        if link.kind == "door":
+            # The room on the entry side owns the crossing; the reverse
+            # direction falls back to this record unless the other room
+            # lists its own door.
+            self.crossings[(link.entry, link.exit)] = link
+            self.crossings.setdefault((link.exit, link.entry), link)
+        elif link.kind == "passage":
+            # Listed hidden or not; crossing() checks revealed per session.
+            self.crossings[(link.entry, link.exit)] = link
+
+    def crossing(self, from_coord, to_coord):
+        """Returns the DoorLink that allows stepping between two cells, if any."""
+        link = self.crossings.get((from_coord, to_coord))
+        if link is not None and not link.revealed:
+            return None
+        return link
+
+    def exits_from(self, coord):
+        """Returns the usable doors and revealed passages starting at coord."""
+        return [link for link in self.by_entry.get(coord, []) if link.revealed]
+
+    def session_key(self):
+        """The current session's own door changes, as a hashable; () if it has none."""
+        overlay = current_overlay()
+        return overlay.door_key if overlay is not None else ()
+
+    def _update(self, link, state):
+        """Writes lock/reveal flags to the link in the current session only."""
+        overlay = current_overlay()
+        if overlay is None:
+            link.shared.update(state)
+            self.version += 1
+            return
+        data = overlay.writable_link(link.room, link.group, link.label)
+        data.update(state)
+        overlay.door_changed(link.room, link.label, data)
+
+    def restore(self, room, label, state):
+        """Applies saved flags without telling listeners. False if there is no such link.
+
+        Flags the current view already has are skipped, so resuming a save
+        copies only the rooms whose doors really changed into the session.
+        """
+        link = self.links.get((room, label))
+        if link is None:
+            return False
+        data = link.data
+        if any(data.get(key, False) != value for key, value in state.items()):
+            self._update(link, state)
+        return True
+
+    def set_locked(self, room, label, locked=True):
+        link = self.links[(room, label)]
+        self._update(link, {"locked": locked})
+        self._notify("lock" if locked else "unlock", link)
+        return link
+
+    def reveal(self, room, label):
+        link = self.links[(room, label)]
+        self._update(link, {"revealed": True})
+        self._notify("reveal", link)
+        return link
+
+    def _notify(self, event, link):
+        for listener in self.listeners:
+            listener(event, link)
+
+
+DOOR_GRAPH = DoorGraph(SHIP_MAP)
+
+
+def unlock_door(room_name, door_label):
+    """Unlocks a door in SHIP_MAP and the compiled door graph."""
+    return DOOR_GRAPH.set_locked(room_name, door_label, False)
+
+
+def lock_door(room_name, door_label):
+    """Locks a door in SHIP_MAP and the compiled door graph."""
+    return DOOR_GRAPH.set_locked(room_name, door_label, True)
+
+
+def reveal_passage(room_name, passage_label):
+    """Marks a secret passage as revealed so it can be used."""
+    return DOOR_GRAPH.reveal(room_name, passage_label)
+
+
 def get_room(position):
     """Returns a tuple of (room_name, room_data) based on the player's position."""
-    for room, data in SHIP_MAP.items():
-        if position in data["coords"]:
-            return room, data
-    return None, None
+    return ROOM_INDEX.lookup(position)
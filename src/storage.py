@@ -0,0 +1,242 @@
+# storage.py — Where save games, world settings and puzzle state are kept
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager, suppress
+
+from src.session import SESSION
+
+SAVE_FILE = 'data/savegame.json'
+SETTINGS_FILE = 'data/settings.json'
+PUZZLE_STATE_FILE = 'data/puzzle_state.json'
+DATABASE_FILE = 'data/forgotten_ship.db'
+# JsonStorage.for_profile() keeps each profile's files in a directory of its own here.
+PROFILES_DIR = 'data/profiles'
+
+# "json" keeps one file per kind of state; "sqlite" keeps every profile and slot in DATABASE_FILE.
+STORAGE_BACKEND = os.environ.get("FORGOTTEN_SHIP_STORAGE", "json")
+PROFILE = os.environ.get("FORGOTTEN_SHIP_PROFILE", "default")
+SLOT = os.environ.get("FORGOTTEN_SHIP_SLOT", "1")
+
+# The kinds of state a slot holds.
+KINDS = ("save", "settings", "puzzle_state")
+
+# Slot used by scratch(); emptied before and after use.
+SCRATCH_SLOT = "scratch"
+
+
+class JsonStorage:
+    """The original layout: one JSON file per kind, shared by everyone."""
+
+    def __init__(self, files=None, profile=PROFILE):
+        self.profile = profile
+        self.files = files or {
+            "save": SAVE_FILE,
+            "settings": SETTINGS_FILE,
+            "puzzle_state": PUZZLE_STATE_FILE,
+        }
+
+    def for_profile(self, profile):
+        """A storage for profile, with the same file names under PROFILES_DIR/<profile>."""
+        directory = os.path.join(PROFILES_DIR, profile)
+        return JsonStorage({kind: os.path.join(directory, os.path.basename(path))
+                            for kind, path in self.files.items()}, profile)
+
+    def read(self, kind):
+        """Returns the stored dict, or None if nothing was saved yet."""
+        path = self.files[kind]
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def write(self, kind, data):
+        # Write a temp file and rename it over the old one so a crash never leaves half a file.
+        path = self.files[kind]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def list_slots(self):
+        return [
+            {"profile": self.profile, "slot": SLOT, "kind": kind,
+             "updated": os.path.getmtime(path), "size": os.path.getsize(path)}
+            for kind, path in self.files.items() if os.path.exists(path)
+        ]
+
+    def delete_profile(self):
+        """Deletes this profile's files, and their directory once it is empty."""
+        for path in self.files.values():
+            if os.path.exists(path):
+                os.remove(path)
+        for directory in {os.path.dirname(path) for path in self.files.values()}:
+            with suppress(OSError):
+                os.rmdir(directory)
+
+    @contextmanager
+    def transaction(self):
+        yield self
+
+    @contextmanager
+    def scratch(self):
+        """Sends reads and writes to empty files in a temporary directory for the duration."""
+        files = self.files
+        with tempfile.TemporaryDirectory() as tmp:
+            self.files = {kind: os.path.join(tmp, os.path.basename(path)) for kind, path in files.items()}
+            try:
+                yield self
+            finally:
+                self.files = files
+
+
+class SqliteStorage:
+    """Keeps state for many profiles and save slots in one SQLite database.
+
+    Every (profile, slot, kind) is one row keyed by its primary key, and
+    the size and update time sit beside the JSON body so list_slots never
+    reads a body. Writes made inside transaction() are committed together.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS profiles (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            created REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS slots (
+            profile_id INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+            slot TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            updated REAL NOT NULL,
+            size INTEGER NOT NULL,
+            body TEXT NOT NULL,
+            PRIMARY KEY (profile_id, slot, kind)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path=DATABASE_FILE, profile=PROFILE, slot=SLOT, conn=None):
+        self.path = path
+        self.slot = slot
+        self.depth = 0
+        if conn is None:
+            # Autocommit mode; transactions are opened explicitly by transaction().
+            # The server opens it at import and uses it from its game thread, one call at a time.
+            conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.executescript(self.SCHEMA)
+        self.conn = conn
+        self.use_profile(profile)
+
+    def for_profile(self, profile):
+        """A storage for profile in the same database, sharing this connection."""
+        return SqliteStorage(self.path, profile, self.slot, conn=self.conn)
+
+    def use_profile(self, name):
+        """Switches to profile name, creating it if needed."""
+        with self.transaction():
+            self.conn.execute(
+                "INSERT OR IGNORE INTO profiles (name, created) VALUES (?, ?)", (name, time.time())
+            )
+            row = self.conn.execute("SELECT id FROM profiles WHERE name = ?", (name,)).fetchone()
+        self.profile = name
+        self.profile_id = row[0]
+
+    def use_slot(self, slot):
+        self.slot = str(slot)
+
+    @contextmanager
+    def scratch(self):
+        """Switches to an empty SCRATCH_SLOT for the duration and deletes it afterwards."""
+        slot = self.slot
+        self.delete_slot(SCRATCH_SLOT)
+        self.use_slot(SCRATCH_SLOT)
+        try:
+            yield self
+        finally:
+            self.delete_slot(SCRATCH_SLOT)
+            self.use_slot(slot)
+
+    def profiles(self):
+        return [name for (name,) in self.conn.execute("SELECT name FROM profiles ORDER BY name")]
+
+    @contextmanager
+    def transaction(self):
+        """Groups writes into one commit. Nested calls join the outer transaction."""
+        if self.depth == 0:
+            self.conn.execute("BEGIN IMMEDIATE")
+        self.depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.depth -= 1
+            if self.depth == 0:
+                self.conn.execute("ROLLBACK")
+            raise
+        self.depth -= 1
+        if self.depth == 0:
+            self.conn.execute("COMMIT")
+
+    def read(self, kind):
+        row = self.conn.execute(
+            "SELECT body FROM slots WHERE profile_id = ? AND slot = ? AND kind = ?",
+            (self.profile_id, self.slot, kind),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def write(self, kind, data):
+        body = json.dumps(data, separators=(",", ":"))
+        with self.transaction():
+            self.conn.execute(
+                "INSERT OR REPLACE INTO slots (profile_id, slot, kind, updated, size, body)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (self.profile_id, self.slot, kind, time.time(), len(body), body),
+            )
+
+    def list_slots(self):
+        """Slots of the current profile, from the row metadata only."""
+        rows = self.conn.execute(
+            "SELECT slot, kind, updated, size FROM slots WHERE profile_id = ? ORDER BY slot, kind",
+            (self.profile_id,),
+        )
+        return [
+            {"profile": self.profile, "slot": slot, "kind": kind, "updated": updated, "size": size}
+            for slot, kind, updated, size in rows
+        ]
+
+    def delete_slot(self, slot):
+        with self.transaction():
+            self.conn.execute(
+                "DELETE FROM slots WHERE profile_id = ? AND slot = ?", (self.profile_id, str(slot))
+            )
+
+    def delete_profile(self):
+        """Deletes this profile and, through the foreign key, every slot it has."""
+        with self.transaction():
+            self.conn.execute("DELETE FROM profiles WHERE id = ?", (self.profile_id,))
+
+    def close(self):
+        self.conn.close()
+
+
+def open_storage(backend=STORAGE_BACKEND):
+    if backend == "sqlite":
+        return SqliteStorage()
+    if backend != "json":
+        print(f"Unknown storage backend '{backend}', using json.")
+    return JsonStorage()
+
+
+STORAGE = open_storage()
+
+def current_storage():
+    """The storage of the session running in this context, or STORAGE outside one."""
+    session = SESSION.get()
+    if session is None or session.storage is None:
+        return STORAGE
+    return session.storage
@@ -1,35 +1,32 @@
 import os
 import json
+from src.coords import Coord, column_label
 from src.inventory import Item
+from src.ship import ROOM_INDEX
+from src.assets import ASSETS
+from src.content import CONTENT_FILES
+from src.storage import current_storage, SAVE_FILE as SAVEGAME_FILE
 
-SAVEGAME_FILE = "data/savegame.json"
-SETTINGS_FILE = "data/settings.json"
-ASCII_ART_FILE = os.path.join("data", "art", "ascii_art.json")
-
-_ascii_art_cache = {}  # Holds loaded ASCII art entries
+ASCII_ART_FILE = CONTENT_FILES["ascii_art"]
 
 def load_settings():
     """Load game settings from the settings.json file."""
-    if os.path.exists(SETTINGS_FILE):
-        with open(SETTINGS_FILE, "r") as f:
-            return json.load(f)
-    else:
-        return {}
+    return current_storage().read("settings") or {}
 
 def save_game(player):
     """Save the player's game state to a JSON file."""
     save_data = {
         "player": {
             "name": player.name,
-            "position": list(player.position),  # e.g., ['J', 10]
+            "position": player.position.label,  # e.g., "J10"
             "health": player.health,
             "inventory": [
                 {"name": item.name, "category": item.category, "description": item.description}
                 for item in player.inventory
             ],
-            "explored_coords": [list(coord) for coord in player.explored_coords]
+            "explored_coords": [coord.label for coord in player.explored_coords]
         },
-        "doors": [list(door) for door in player.doors_coords.keys()]
+        "doors": [door.label for door in player.doors_coords]
     }
 
     try:
@@ -48,15 +45,15 @@ def load_game():
                 save_data = json.load(f)
 
             player_data = save_data["player"]
-            position = tuple(player_data["position"])
+            position = Coord.coerce(player_data["position"])
             health = player_data["health"]
             inventory = [Item(item["name"], item["category"], item["description"]) for item in player_data["inventory"]]
-            explored_coords = {tuple(coord) for coord in player_data["explored_coords"]}
-            doors_coords = {tuple(door): tuple(door) for door in save_data.get("doors", [])}
+            explored_coords = {Coord.coerce(coord) for coord in player_data["explored_coords"]}
+            doors_coords = {Coord.coerce(door): Coord.coerce(door) for door in save_data.get("doors", [])}
 
             return position, health, inventory, explored_coords, doors_coords
 
-        except (json.JSONDecodeError, IOError) as e:
+        except (json.JSONDecodeError, IOError, ValueError) as e:
             print(f"Error loading savegame: {e}")
             return None, None, [], set(), {}
     else:
@@ -64,65 +61,63 @@ def load_game():
         return None, None, [], set(), {}
 
 
-def generate_map(player_position, doors_coords):
+def generate_map(player_position, explored_coords=(), doors_coords=(), visited_coords=None):
     """
     Display the ship's map with the current player's position,
-    explored areas (from visited_coords in settings), and visible doors.
+    explored areas (visited_coords, read from settings if not given), and visible doors.
     """
-    width, height = 26, 25  # A-Z (26 columns), 1–25 rows
+    # Size the map to the ship rather than a fixed A-Z grid.
+    _, _, max_x, max_y = ROOM_INDEX.bounds
+    width = max(max_x, player_position.x) + 1
+    height = max(max_y, player_position.y)
     ship_map = [[" " for _ in range(width)] for _ in range(height)]
-    cols = [chr(i) for i in range(ord('A'), ord('Z') + 1)]
+    cols = [column_label(x) for x in range(width)]
 
-    # Load visited_coords from settings.json
-    settings = load_settings()
-    visited_coords = {tuple(coord) for coord in settings.get("visited_coords", [])}
+    # Load visited_coords from settings.json unless the caller has them in memory
+    if visited_coords is None:
+        visited_coords = load_settings().get("visited_coords", [])
+    visited_coords = {Coord.coerce(coord) for coord in visited_coords}
+    visited_coords.update(explored_coords)
+
+    def plot(coord, symbol):
+        # Only the player's deck is drawn.
+        if coord.z == player_position.z and 0 <= coord.x < width and 1 <= coord.y <= height:
+            ship_map[coord.y - 1][coord.x] = symbol
 
     # Plot visited cells
-    for col_letter, row_num in visited_coords:
-        x = cols.index(col_letter.upper())
-        y = row_num - 1
-        ship_map[y][x] = 'o'
+    for coord in visited_coords:
+        plot(coord, 'o')
 
     # Plot doors in visited areas only
-    for coord in doors_coords.values():
-        col_letter, row_num = coord
-        if (col_letter, row_num) in visited_coords:
-            x = cols.index(col_letter.upper())
-            y = row_num - 1
-            ship_map[y][x] = 'D'
+    if isinstance(doors_coords, dict):
+        doors_coords = doors_coords.values()
+    for coord in set(doors_coords) | {c for c in visited_coords if ROOM_INDEX.is_door(c)}:
+        if coord in visited_coords:
+            plot(coord, 'D')
 
     # Plot player
-    px_letter, py_num = player_position
-    px = cols.index(px_letter.upper())
-    py = py_num - 1
-    ship_map[py][px] = '@'
+    plot(player_position, '@')
 
-    # Print map from top (25) to bottom (1)
-    print("\n=== SHIP MAP ===")
+    # Print map from top to bottom (row 1)
+    label_width = len(str(height))
+    print("\n=== SHIP MAP ===" if not player_position.z else f"\n=== SHIP MAP (Deck {player_position.z}) ===")
     for y in reversed(range(height)):
-        row_label = f"{y + 1:2}"
+        row_label = f"{y + 1:{label_width}}"
         row_data = "".join(ship_map[y])
         print(f"{row_label} | {row_data}")
 
-    header = "     " + "  ".join(cols)
-    print(header)
+    # Column labels run vertically so wide ships (AA, AB, ...) still line up.
+    label_depth = max(len(col) for col in cols)
+    for depth in range(label_depth):
+        line = "".join(col.rjust(label_depth)[depth] for col in cols)
+        print(" " * (label_width + 3) + line)
 
 
 # === ASCII ART SECTION ===
 
 def load_ascii_art():
-    """Load ASCII art data from a JSON file into memory once."""
-    global _ascii_art_cache
-    if not _ascii_art_cache:
-        if os.path.exists(ASCII_ART_FILE):
-            try:
-                with open(ASCII_ART_FILE, "r") as f:
-                    _ascii_art_cache = json.load(f)
-            except json.JSONDecodeError as e:
-                print(f"Error loading ASCII art: {e}")
-        else:
-            print("Warning: ASCII art file not found.")
-    return _ascii_art_cache
+    """Return the ASCII art catalog, loaded once and shared."""
+    return ASSETS.catalog()
 
 
 def show_ascii_art(art_id):
@@ -132,13 +127,5 @@ def show_ascii_art(art_id):
     Parameters:
         art_id (str): The numeric key of the art to show, e.g., "01"
     """
-    art_data = load_ascii_art().get(art_id)
-
-    if art_data:
-        print()  # Spacer line before art
-        for line in art_data["art"]:
-            print(line)
-        if "description" in art_data:
-            print(f"\n{art_data['description']}")
-    else:
+    if not ASSETS.show(art_id):
         print(f"[Missing ASCII art for ID {art_id}]")
@@ -0,0 +1,121 @@
+# vision.py — Line-of-sight field of view shared by look, can_see and item display
+from src.coords import DIRECTIONS, step
+from src.ship import DOOR_GRAPH, ROOM_INDEX
+
+# Sight radius in cells for each light mode.
+VISION_RADIUS = {
+    "dark": 1,
+    "flashlight": 4,
+}
+
+MAX_CACHED_VIEWS = 4096
+
+# Octant transforms for recursive shadowcasting.
+_OCTANTS = [
+    (1, 0, 0, 1), (0, 1, 1, 0), (0, -1, 1, 0), (-1, 0, 0, 1),
+    (-1, 0, 0, -1), (0, -1, -1, 0), (0, 1, -1, 0), (1, 0, 0, -1),
+]
+
+
+def light_mode(has_flashlight):
+    return "flashlight" if has_flashlight else "dark"
+
+
+class FieldOfView:
+    """Recursive shadowcasting over the ship grid, cached per (cell, light mode).
+
+    Light travels through the cells of the viewer's room and stops at
+    anything else, except that the far side of an open door out of the room
+    is visible. Views are cached per session door state too, so sessions
+    that changed no doors share them. The cache is dropped when the room
+    index is rebuilt or a door changes state outside a session.
+    """
+
+    def __init__(self):
+        self.views = {}
+        self.versions = None
+
+    def _check_versions(self):
+        versions = (ROOM_INDEX.version, DOOR_GRAPH.version)
+        if versions != self.versions:
+            self.views.clear()
+            self.versions = versions
+
+    def visible_from(self, position, mode="dark"):
+        """Returns the frozenset of cells visible from position."""
+        self._check_versions()
+        cache_key = (position, mode, DOOR_GRAPH.session_key())
+        view = self.views.get(cache_key)
+        if view is None:
+            view = self._compute(position, VISION_RADIUS[mode])
+            if len(self.views) >= MAX_CACHED_VIEWS:
+                self.views.clear()
+            self.views[cache_key] = view
+        return view
+
+    def _compute(self, origin, radius):
+        room = ROOM_INDEX.room_name_at(origin)
+        if room is None:
+            return frozenset()
+
+        def transparent(cell):
+            return ROOM_INDEX.room_name_at(cell) == room
+
+        lit = {origin}
+        for xx, xy, yx, yy in _OCTANTS:
+            self._cast(origin, 1, 1.0, 0.0, radius, xx, xy, yx, yy, transparent, lit)
+
+        visible = {cell for cell in lit if transparent(cell)}
+        # Lit cells just past an open door out of the room are visible too.
+        for cell in lit - visible:
+            if ROOM_INDEX.room_name_at(cell) is None:
+                continue
+            for direction in DIRECTIONS:
+                neighbor = step(cell, direction)
+                if neighbor not in visible:
+                    continue
+                door = DOOR_GRAPH.crossing(neighbor, cell)
+                if door and door.kind == "door" and not door.locked:
+                    visible.add(cell)
+                    break
+        return frozenset(visible)
+
+    def _cast(self, origin, row, start, end, radius, xx, xy, yx, yy, transparent, lit):
+        if start < end:
+            return
+        radius_squared = radius * radius
+        new_start = start
+        for j in range(row, radius + 1):
+            dx, dy = -j - 1, -j
+            blocked = False
+            while dx <= 0:
+                dx += 1
+                cell = origin.offset(dx * xx + dy * xy, dx * yx + dy * yy)
+                left_slope = (dx - 0.5) / (dy + 0.5)
+                right_slope = (dx + 0.5) / (dy - 0.5)
+                if start < right_slope:
+                    continue
+                if end > left_slope:
+                    break
+                if dx * dx + dy * dy <= radius_squared:
+                    lit.add(cell)
+                if blocked:
+                    if not transparent(cell):
+                        new_start = right_slope
+                        continue
+                    blocked = False
+                    start = new_start
+                elif not transparent(cell) and j < radius:
+                    blocked = True
+                    self._cast(origin, j + 1, start, left_slope, radius, xx, xy, yx, yy, transparent, lit)
+                    new_start = right_slope
+            if blocked:
+                break
+
+
+FIELD_OF_VIEW = FieldOfView()
+
+
+def visible_tiles(position, has_flashlight=False):
+    """Cells the player can see from position with or without a flashlight."""
+    return FIELD_OF_VIEW.visible_from(position, light_mode(has_flashlight))
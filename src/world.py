@@ -0,0 +1,141 @@
+# world.py — Session world state kept in memory and flushed to settings.json
+import json
+import time
+
+from src.coords import Coord
+from src.inventory import current_items
+from src.ship import ROOM_INDEX
+from src.storage import current_storage
+
+# Seconds between automatic write-behind flushes of unsaved changes.
+# None turns automatic flushing off, leaving only save and quit.
+WRITE_BEHIND_SECONDS = 60
+
+
+def save_item_positions_to_settings(item_positions, visited_coords=None, completed_tasks=None):
+    """Save the randomly generated item positions and additional player state to settings.json."""
+    settings_data = {
+        "item_positions": {
+            room: {name: Coord.coerce(pos).label for name, pos in items.items()}
+            for room, items in item_positions.items()
+        },
+    }
+
+    # NEW: Add visited_coords and completed_tasks
+    if visited_coords is not None:
+        settings_data["visited_coords"] = [Coord.coerce(coord).label for coord in visited_coords]
+    if completed_tasks is not None:
+        settings_data["completed_tasks"] = list(completed_tasks)
+
+    current_storage().write("settings", settings_data)
+
+
+def load_item_positions():
+    """Load the item positions and player state from settings.json."""
+    try:
+        settings_data = current_storage().read("settings") or {}
+        # Positions may be labels ("J10") or legacy ["J", 10] pairs.
+        return {
+            "item_positions": {
+                room: {name: Coord.coerce(pos) for name, pos in items.items()}
+                for room, items in settings_data.get("item_positions", {}).items()
+            },
+            "visited_coords": [Coord.coerce(coord) for coord in settings_data.get("visited_coords", [])],
+            "completed_tasks": settings_data.get("completed_tasks", []),
+        }
+    except (FileNotFoundError, json.JSONDecodeError, AttributeError, TypeError, ValueError):
+        return {
+            "item_positions": {},
+            "visited_coords": [],
+            "completed_tasks": [],
+        }
+
+
+class WorldState:
+    """Owns item positions, visited cells and completed tasks for a session.
+
+    Everything is read from settings.json once by load() and then changed
+    in memory only. flush() writes it back; the game calls it on save and
+    quit, and tick() calls it once unsaved changes are older than
+    flush_interval seconds.
+    """
+
+    def __init__(self, items=None, flush_interval=WRITE_BEHIND_SECONDS):
+        self.items = items or current_items()   # the session's item index unless given one
+        self.flush_interval = flush_interval
+        self.visited_coords = []
+        self.visited = set()
+        self.visited_rooms = set()  # lower-case room names, for conditions
+        self.completed_tasks = []
+        self.completed = set()      # same as completed_tasks, for O(1) checks
+        self.changed = False
+        self.flushed_items_version = None
+        self.dirty_since = None
+        self.listeners = []  # called with (event, value), e.g. ("task", name)
+
+    def load(self, exclude=(), generate=None):
+        """Reads settings.json into memory.
+
+        exclude names items already carried. When no item positions are saved,
+        generate() is called for a fresh placement, which is written out at once.
+        """
+        settings = load_item_positions()
+        item_positions = settings["item_positions"]
+        self.visited_coords = settings["visited_coords"]
+        self.visited = set(self.visited_coords)
+        self.visited_rooms = {room.lower() for room in map(ROOM_INDEX.room_name_at, self.visited) if room}
+        self.completed_tasks = settings["completed_tasks"]
+        self.completed = set(self.completed_tasks)
+
+        fresh = not item_positions and generate is not None
+        if fresh:
+            item_positions = generate()
+        self.items.load(item_positions, exclude=exclude)
+        self.changed = False
+        self.flushed_items_version = self.items.version
+        self.dirty_since = None
+        if fresh:
+            self.flush()
+
+    @property
+    def dirty(self):
+        return self.changed or self.items.version != self.flushed_items_version
+
+    def mark_dirty(self):
+        self.changed = True
+
+    def mark_visited(self, coord):
+        if coord not in self.visited:
+            self.visited.add(coord)
+            self.visited_coords.append(coord)
+            room = ROOM_INDEX.room_name_at(coord)
+            if room:
+                self.visited_rooms.add(room.lower())
+            self.changed = True
+
+    def complete_task(self, task):
+        if task not in self.completed:
+            self.completed.add(task)
+            self.completed_tasks.append(task)
+            self.changed = True
+            for listener in self.listeners:
+                listener("task", task)
+
+    def tick(self):
+        """Flushes unsaved changes once they have waited flush_interval seconds."""
+        if not self.dirty:
+            self.dirty_since = None
+            return False
+        now = time.monotonic()
+        if self.dirty_since is None:
+            self.dirty_since = now
+        if self.flush_interval is not None and now - self.dirty_since >= self.flush_interval:
+            self.flush()
+            return True
+        return False
+
+    def flush(self):
+        save_item_positions_to_settings(self.items.positions(), self.visited_coords, self.completed_tasks)
+        self.changed = False
+        self.flushed_items_version = self.items.version
+        self.dirty_since = None